@@ -1,46 +1,113 @@
-import sys
+import queue
+import threading
 import tkinter as tk
 from tkinter import scrolledtext
 from maintest import process  # Import the process function from maintest.py
+# Importable once maintest has put the top-level directory on sys.path
+from prolog_terms import QueryAborted, limits
+
+# How often the Tk loop checks for finished answers (about 60 times a second)
+POLL_MS = 16
+
+# Sentences waiting for the worker, as (request id, sentence)
+requests = queue.Queue()
+
+# Finished answers, as (request id, sentence, output text)
+responses = queue.Queue()
+
+# Seconds a question may run before it is stopped in Prolog
+QUERY_TIMEOUT = 10
+
+# Requests at or below this id were cancelled; their answers are dropped
+cancelled_up_to = 0
+next_request = 0
+pending = 0
+
+# Set by cancel() to stop the question being answered at its next goal
+current_cancel = threading.Event()
+
+
+def worker():
+    """Answer sentences off the Tk thread, one complete answer at a time.
+
+    Questions run under prolog_terms.limits(), so Cancel or the timeout
+    stops them in Prolog. Statements are short and always run to the end,
+    so no half-learned sentence is left behind.
+    """
+    global current_cancel
+    while True:
+        request_id, sentence = requests.get()
+        if request_id <= cancelled_up_to:
+            continue
+        current_cancel = cancelled = threading.Event()
+        # cancel() may have run between the two checks
+        if request_id <= cancelled_up_to:
+            continue
+        try:
+            if sentence.rstrip().endswith("?"):
+                with limits(QUERY_TIMEOUT, cancelled):
+                    result = process(sentence)
+            else:
+                result = process(sentence)
+            output = str(result) if result else "Invalid input given."
+        except QueryAborted:
+            output = "The question took too long and was stopped."
+        except Exception as e:
+            output = f"Error: {e}"
+        responses.put((request_id, sentence, output))
 
 
 def submit_input(event=None):  # Add event parameter for Enter key binding
+    global next_request, pending
     input_text = input_entry.get()
     if input_text.lower() == "quit":
         root.quit()
         return
+    input_entry.delete(0, tk.END)
 
-    try:
-        # Append input to the chat history
-        scrolled_text.insert(tk.END, f"You: {input_text}\n")
+    # Append input to the chat history
+    scrolled_text.insert(tk.END, f"You: {input_text}\n")
+    scrolled_text.yview(tk.END)
 
-        # Redirect process output to GUI
-        class RedirectOutput:
-            def __init__(self, widget):
-                self.widget = widget
+    next_request += 1
+    pending += 1
+    requests.put((next_request, input_text))
+    set_busy(True)
 
-            def write(self, string):
-                self.widget.insert(tk.END, string)
 
-            def flush(self):
-                pass  # No-op for compatibility
+def cancel():
+    """Drop queued sentences and stop the question being answered."""
+    global cancelled_up_to, pending
+    cancelled_up_to = next_request
+    current_cancel.set()
+    if pending:
+        scrolled_text.insert(tk.END, "Cancelled.\n\n")
+        scrolled_text.yview(tk.END)
+    pending = 0
+    set_busy(False)
 
-        sys.stdout = RedirectOutput(scrolled_text)
-        sys.stderr = RedirectOutput(scrolled_text)
 
-        # Call the process function and capture output
-        process(input_text)
-    except Exception as e:
-        scrolled_text.insert(tk.END, f"Error: {e}\n")
+def poll_responses():
+    """Insert finished answers, each with a single widget update."""
+    global pending
+    try:
+        while True:
+            request_id, sentence, output = responses.get_nowait()
+            if request_id <= cancelled_up_to:
+                continue
+            pending -= 1
+            # Add a separator for readability
+            scrolled_text.insert(tk.END, output + "\n\n")
+            scrolled_text.yview(tk.END)  # Auto-scroll to the latest entry
+    except queue.Empty:
+        pass
+    set_busy(pending > 0)
+    root.after(POLL_MS, poll_responses)
 
-    finally:
-        input_entry.delete(0, tk.END)
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
 
-    # Add a separator for readability
-    scrolled_text.insert(tk.END, "\n")
-    scrolled_text.yview(tk.END)  # Auto-scroll to the latest entry
+def set_busy(busy):
+    status_label.config(text="Working..." if busy else "")
+    cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
 
 
 # Create GUI window
@@ -65,8 +132,20 @@ submit_button.pack(side=tk.RIGHT)
 # Bind Enter key to submit input
 input_entry.bind("<Return>", submit_input)
 
+# Busy indicator and cancel button
+status_frame = tk.Frame(root)
+status_frame.pack(pady=5)
+
+status_label = tk.Label(status_frame, text="", width=12)
+status_label.pack(side=tk.LEFT, padx=5)
+
+cancel_button = tk.Button(status_frame, text="Cancel", command=cancel, state=tk.DISABLED)
+cancel_button.pack(side=tk.LEFT)
+
 # Quit button
 quit_button = tk.Button(root, text="Quit", command=root.quit)
 quit_button.pack(pady=5)
 
+threading.Thread(target=worker, daemon=True).start()
+root.after(POLL_MS, poll_responses)
 root.mainloop()
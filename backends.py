@@ -0,0 +1,267 @@
+"""Engines that answer relationship goals for main.py.
+
+PrologBackend runs relationship.pl on SWI-Prolog through pyswip.
+GraphBackend evaluates the same rules in Python over a FamilyIndex, so
+it also works on hosts without SWI-Prolog. DifferentialBackend answers
+with one backend and checks every answer against another.
+
+All backends have the same methods; names are lowercase atoms.
+
+    start()                         get ready for queries
+    assert_facts(facts)             add a list of (predicate, names) facts
+    exists(predicate, *names)       check a ground goal
+    relation_sets(relation, names)  per name, the sorted X with relation(X, name)
+    facts(indicators)               list the stored facts of some predicates
+    load_journal(journal)           add the facts saved in a FactJournal
+    reload()                        load the rules again
+
+index_relations is the set of relations main.py may answer from its own
+FamilyIndex instead of asking the backend.
+"""
+from family_index import GENDER_CODES, GENDERED, RELATIONS, VIEWS
+from journal import parse_fact
+from kb_loader import load_rules
+from prolog_terms import assert_facts, goal_exists, relation_sets
+
+# relative/2 in relationship.pl is the disjunction of these relations
+RELATIVE_RELATIONS = ("parent", "child", "siblings", "grandparent", "grandchild",
+                      "uncle", "aunt", "cousin", "aunt_or_uncle", "father", "mother",
+                      "brother", "sister", "son", "daughter")
+
+# Every relation GraphBackend can evaluate
+GRAPH_RELATIONS = RELATIONS | {"grandchild", "relative"}
+
+# Relations read straight from the views FamilyIndex materializes
+# (grandparent, aunt_or_uncle, cousin) and their gendered forms
+VIEW_RELATIONS = frozenset(relation for relation in RELATIONS
+                           if GENDERED.get(relation, (relation,))[0] in VIEWS)
+
+
+class PrologBackend:
+    """relationship.pl on SWI-Prolog.
+
+    prolog is a kb_loader.LazyProlog; lock serializes text queries (see
+    main.prolog_lock).
+    """
+
+    name = "prolog"
+    # Only the materialized views skip Prolog; relationship.pl answers
+    # everything else
+    index_relations = VIEW_RELATIONS
+    uses_prolog = True
+
+    def __init__(self, prolog, rules_file, lock):
+        self.prolog = prolog
+        self.rules_file = rules_file
+        self.lock = lock
+
+    def start(self):
+        self.prolog.start()
+
+    def query(self, text):
+        """Run a Prolog text query and return all its solutions."""
+        with self.lock:
+            return list(self.prolog.query(text))
+
+    def assert_facts(self, facts):
+        self.prolog.start()
+        assert_facts(facts)
+
+    def exists(self, predicate, *names):
+        self.prolog.start()
+        return goal_exists(predicate, *names)
+
+    def relation_sets(self, relation, names):
+        self.prolog.start()
+        return relation_sets(relation, names)
+
+    def facts(self, indicators):
+        facts = []
+        for indicator in indicators:
+            predicate, arity = indicator.split("/")
+            variables = ["X", "Y"][:int(arity)]
+            # clause/2 skips facts derived by rules, e.g. uncle/2
+            for result in self.query(f"clause({predicate}({', '.join(variables)}), true)"):
+                facts.append((predicate, tuple(str(result[v]) for v in variables)))
+        return facts
+
+    def load_journal(self, journal):
+        journal.load(self.prolog)
+        self.query("abolish_all_tables")
+
+    def reload(self):
+        load_rules(self.prolog, self.rules_file)
+        self.query("abolish_all_tables")
+
+
+class GraphBackend:
+    """The rules of relationship.pl evaluated over a FamilyIndex.
+
+    The index is the fact store: asserting adds to it, and main.py can
+    share its own index with the backend, since adding a fact twice is
+    a no-op.
+    """
+
+    name = "graph"
+    index_relations = GRAPH_RELATIONS
+    uses_prolog = False
+
+    def __init__(self, index):
+        self.index = index
+
+    def start(self):
+        pass
+
+    def assert_facts(self, facts):
+        for predicate, names in facts:
+            self.index.add_fact(predicate, *names)
+
+    def exists(self, predicate, *names):
+        people = [self.index.people.lookup(name) for name in names]
+        if len(names) == 1:
+            return people[0] is not None and self.index.gender(people[0]) == predicate
+        if predicate not in GRAPH_RELATIONS:
+            raise KeyError(predicate)
+        return None not in people and self.holds(predicate, *people)
+
+    def relation_sets(self, relation, names):
+        if relation not in GRAPH_RELATIONS:
+            raise KeyError(relation)
+        sets = []
+        for name in names:
+            person = self.index.people.lookup(name)
+            related = () if person is None else self.related(relation, person)
+            sets.append(sorted(self.index.name(other) for other in related))
+        return sets
+
+    def holds(self, relation, person1, person2):
+        """Evaluate relation(person1, person2) for two person IDs."""
+        index = self.index
+        if relation == "relative":
+            return (index.has_fact("relative", person1, person2)
+                    or any(self.holds(part, person1, person2) for part in RELATIVE_RELATIONS))
+        if relation == "grandchild":
+            # grandchild(X, Y) :- grandparent(Y, X).
+            return (index.has_fact("grandchild", person1, person2)
+                    or index.holds("grandparent", person2, person1))
+        return index.holds(relation, person1, person2)
+
+    def related(self, relation, person):
+        """Return the set of IDs X for which relation(X, person) holds."""
+        index = self.index
+        if relation == "relative":
+            result = set()
+            for part in RELATIVE_RELATIONS:
+                result |= self.related(part, person)
+        elif relation == "grandchild":
+            result = self._grandchildren(person)
+        else:
+            return index.related(relation, person)
+        facts = index.facts.get(relation)
+        if facts is not None:
+            result |= facts.backward.get(person, set())
+        return result
+
+    def _grandchildren(self, person):
+        """Return the IDs Y with grandparent(person, Y)."""
+        index = self.index
+        result = set(index.views["grandparent"].forward.get(person, ()))
+        facts = index.facts.get("grandparent")
+        if facts is not None:
+            result |= facts.forward.get(person, set())
+        return result
+
+    def facts(self, indicators):
+        index = self.index
+        facts = []
+        for indicator in indicators:
+            predicate = indicator.split("/")[0]
+            if predicate == "parent":
+                pairs = [(parent, child) for child, parents in index.parents.items()
+                         for parent in parents]
+            elif predicate == "siblings_direct":
+                pairs = [(group[0], member) for group in index.sibling_groups()
+                         for member in group[1:]]
+            elif predicate in GENDER_CODES:
+                facts += [(predicate, (index.name(person),)) for person in range(len(index.people))
+                          if index.gender(person) == predicate]
+                continue
+            else:
+                table = index.facts.get(predicate)
+                pairs = [] if table is None else [
+                    (person1, person2) for person1, targets in table.forward.items()
+                    for person2 in targets]
+            facts += [(predicate, (index.name(person1), index.name(person2)))
+                      for person1, person2 in pairs]
+        return facts
+
+    def load_journal(self, journal):
+        self.assert_facts([parse_fact(fact) for fact in journal.facts()])
+
+    def reload(self):
+        # The rules are code; there is nothing to load
+        pass
+
+
+class DifferentialBackend:
+    """Answers from reference and checks every answer of candidate.
+
+    Differences, including exceptions raised by the candidate only, are
+    collected in mismatches as (goal, expected, actual) tuples.
+    """
+
+    name = "differential"
+    # Every question has to reach both backends
+    index_relations = frozenset()
+    uses_prolog = True
+
+    def __init__(self, reference, candidate):
+        self.reference = reference
+        self.candidate = candidate
+        self.checks = 0
+        self.mismatches = []
+
+    def start(self):
+        self.reference.start()
+        self.candidate.start()
+
+    def assert_facts(self, facts):
+        self.reference.assert_facts(facts)
+        self.candidate.assert_facts(facts)
+
+    def exists(self, predicate, *names):
+        expected = self.reference.exists(predicate, *names)
+        self._check((predicate, *names), expected, self.candidate.exists, predicate, *names)
+        return expected
+
+    def relation_sets(self, relation, names):
+        expected = self.reference.relation_sets(relation, names)
+        self._check((relation, *names), expected, self.candidate.relation_sets, relation, names)
+        return expected
+
+    def _check(self, goal, expected, method, *args):
+        self.checks += 1
+        try:
+            actual = method(*args)
+        except Exception as e:
+            actual = e
+        if actual != expected:
+            self.mismatches.append((goal, expected, actual))
+
+    def facts(self, indicators):
+        return self.reference.facts(indicators)
+
+    def load_journal(self, journal):
+        self.reference.load_journal(journal)
+        self.candidate.load_journal(journal)
+
+    def reload(self):
+        self.reference.reload()
+        self.candidate.reload()
+
+    def summary(self):
+        """Return a report of the checks and their mismatches."""
+        lines = [f"Differential check: {self.checks} goals, {len(self.mismatches)} mismatches"]
+        for goal, expected, actual in self.mismatches:
+            lines.append(f"  {goal[0]}({', '.join(goal[1:])}): expected {expected!r}, got {actual!r}")
+        return "\n".join(lines)
@@ -0,0 +1,309 @@
+"""Benchmark sentence throughput and query latency on synthetic families.
+
+Example:
+
+    python benchmark.py --depth 3 --branching 2 --sibling-group 3 \
+        --families 4 --output results.json
+
+Each target (main.py's process_sentence, maintest.py's process) runs in
+its own interpreter, since both share pyswip's single Prolog engine.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from results import ANSWERED, FAILED, LEARNED
+
+TARGETS = {
+    "main": "process_sentence",
+    "maintest": "process",
+}
+
+QUERY_TEMPLATES = {
+    "siblings": "Are {} and {} siblings?",
+    "cousin": "Are {} and {} cousins?",
+    "uncle": "Is {} an uncle of {}?",
+    "grandfather": "Is {} a grandfather of {}?",
+    "relatives": "Are {} and {} relatives?",
+    "who_siblings": "Who are the siblings of {}?",
+}
+
+# Letters for generated names. s, n and h are left out so no name
+# contains a relation keyword such as "son" or "aunt", which
+# maintest.process looks for anywhere in the sentence.
+CONSONANTS = "bdfklmprtv"
+VOWELS = "aeiou"
+
+
+def make_name(index):
+    """Return a unique capitalized name of two or more syllables."""
+    syllables = []
+    index += len(CONSONANTS) * len(VOWELS)
+    while index:
+        index, digit = divmod(index, len(CONSONANTS) * len(VOWELS))
+        consonant, vowel = divmod(digit, len(VOWELS))
+        syllables.append(CONSONANTS[consonant] + VOWELS[vowel])
+    return "".join(syllables).capitalize()
+
+
+class FamilyTree:
+    """Synthetic families and the sentences that describe them."""
+
+    def __init__(self, depth, branching, sibling_group, families, seed=0):
+        self.rng = random.Random(seed)
+        self.sentences = []
+        self.generations = [[] for _ in range(depth + 1)]
+        self.groups = []
+        self.size = 0
+
+        for _ in range(families):
+            couples = [(self.new_person(0), self.new_person(0))]
+            for generation in range(1, depth + 1):
+                next_couples = []
+                for father, mother in couples:
+                    group = [self.new_person(generation) for _ in range(sibling_group)]
+                    self.add_group(father, mother, group)
+                    for child in group[:branching]:
+                        next_couples.append((child, self.new_person(generation)))
+                couples = next_couples
+
+    def new_person(self, generation):
+        name = make_name(self.size)
+        self.size += 1
+        self.generations[generation].append(name)
+        return name
+
+    def add_group(self, father, mother, group):
+        """Describe one sibling group: explicit siblings first, then parents."""
+        self.groups.append(group)
+        for sibling1, sibling2 in zip(group, group[1:]):
+            self.sentences.append(f"{sibling1} and {sibling2} are siblings.")
+        for child in group:
+            self.sentences.append(f"{father} is the father of {child}.")
+            self.sentences.append(f"{mother} is the mother of {child}.")
+
+    def pick(self, generation):
+        people = self.generations[generation]
+        return self.rng.choice(people) if people else None
+
+    def query_pair(self, kind):
+        """Pick two people for a query; roughly half are related pairs."""
+        depth = len(self.generations) - 1
+        if kind == "siblings" and self.rng.random() < 0.5:
+            group = self.rng.choice(self.groups)
+            if len(group) > 1:
+                return tuple(self.rng.sample(group, 2))
+        if kind == "uncle" and depth >= 2:
+            generation = self.rng.randint(1, depth - 1)
+            return self.pick(generation), self.pick(generation + 1)
+        if kind == "grandfather" and depth >= 2:
+            generation = self.rng.randint(0, depth - 2)
+            return self.pick(generation), self.pick(generation + 2)
+        if kind in ("siblings", "cousin"):
+            generation = self.rng.randint(1, depth)
+            return self.pick(generation), self.pick(generation)
+        everyone = [name for people in self.generations for name in people]
+        return tuple(self.rng.sample(everyone, 2))
+
+    def queries(self, kind, count):
+        template = QUERY_TEMPLATES[kind]
+        return [template.format(*self.query_pair(kind)) for _ in range(count)]
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list, in milliseconds."""
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, round(fraction * len(samples)) - 1))
+    return samples[index] * 1000
+
+
+def deep_sizeof(obj, skip=(str,)):
+    """Return the bytes of obj and everything it references, once each.
+
+    Objects of the skip types, and what they reference, are not counted.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, skip):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+        elif hasattr(current, "__slots__"):
+            stack.extend(getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot))
+    return total
+
+
+def memory_report(module):
+    """Bytes per person of main.py's index and of its compact snapshot."""
+    from family_index import PersonRegistry
+
+    people = len(module.family_index.people) or 1
+    names, rest = module.compact_snapshot().nbytes()
+    return {
+        "people": len(module.family_index.people),
+        # Names and the name registry are left out of both
+        "index_bytes_per_person": deep_sizeof(module.family_index, (str, PersonRegistry)) / people,
+        "compact_bytes_per_person": rest / people,
+        "compact_name_bytes_per_person": names / people,
+    }
+
+
+def status_of(result):
+    """Return a Result's status, or "unsupported" for a false value."""
+    return result.status if result else "unsupported"
+
+
+def run_target(target, tree, query_count, backend="prolog"):
+    """Drive one target module in this process and return its results.
+
+    backend selects main.py's backend; maintest.py always uses Prolog.
+    Only answered queries count towards the latency percentiles, and
+    only learned sentences towards assertions_per_sec.
+    """
+    module = __import__(target)
+    process = getattr(module, TARGETS[target])
+    if target == "main":
+        module.use_backend(backend)
+
+    results = {"target": target, "queries": {}}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # Start Prolog before timing anything
+        process("Is Warmup a child of Start?")
+
+        assertion_statuses = Counter()
+        start = time.perf_counter()
+        for sentence in tree.sentences:
+            assertion_statuses[status_of(process(sentence))] += 1
+        elapsed = time.perf_counter() - start
+
+        for kind in QUERY_TEMPLATES:
+            latencies = []
+            statuses = Counter()
+            for sentence in tree.queries(kind, query_count):
+                query_start = time.perf_counter()
+                result = process(sentence)
+                query_time = time.perf_counter() - query_start
+                status = status_of(result)
+                statuses[status] += 1
+                if status == ANSWERED:
+                    latencies.append(query_time)
+            latencies.sort()
+            results["queries"][kind] = {
+                "count": sum(statuses.values()),
+                "answered": statuses[ANSWERED],
+                "failed": statuses[FAILED],
+                "unsupported": statuses["unsupported"],
+                "statuses": dict(statuses),
+                "p50_ms": percentile(latencies, 0.50),
+                "p99_ms": percentile(latencies, 0.99),
+            }
+
+    if target == "main":
+        results["memory"] = memory_report(module)
+    results["assertions"] = len(tree.sentences)
+    results["learned"] = assertion_statuses[LEARNED]
+    results["assertion_statuses"] = dict(assertion_statuses)
+    results["assertion_seconds"] = elapsed
+    results["assertions_per_sec"] = assertion_statuses[LEARNED] / elapsed if elapsed else None
+    return results
+
+
+def run_isolated(target, argv):
+    """Run one target in a fresh interpreter and return its results."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "result.json")
+        command = [sys.executable, os.path.abspath(__file__), *argv, "--target", target, "--output", output]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(output, encoding="utf-8") as stream:
+            return json.load(stream)["runs"][0]
+
+
+def print_report(report):
+    for run in report["runs"]:
+        print(f"{run['target']}: {run['assertions']} assertions, "
+              f"{run['learned']} learned, {run['assertions_per_sec']:.1f}/s")
+        others = {status: count for status, count in run["assertion_statuses"].items() if status != LEARNED}
+        if others:
+            print(f"  not learned: {', '.join(f'{count} {status}' for status, count in sorted(others.items()))}")
+        if "memory" in run:
+            memory = run["memory"]
+            print(f"  memory per person: index {memory['index_bytes_per_person']:.0f} B, "
+                  f"compact {memory['compact_bytes_per_person']:.0f} B "
+                  f"(+{memory['compact_name_bytes_per_person']:.0f} B names)")
+        for kind, stats in run["queries"].items():
+            if stats["unsupported"] == stats["count"]:
+                line = "unsupported"
+            elif not stats["answered"]:
+                line = "no answers"
+            else:
+                line = f"p50 {stats['p50_ms']:.3f} ms  p99 {stats['p99_ms']:.3f} ms"
+            if stats["failed"]:
+                line += f"  ({stats['failed']} failed)"
+            print(f"  {kind:<12} {line}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sentence throughput and query latency.")
+    parser.add_argument("--depth", type=int, default=3, help="generations below each founding couple")
+    parser.add_argument("--branching", type=int, default=2, help="children per couple who start a family")
+    parser.add_argument("--sibling-group", type=int, default=3, help="children per couple")
+    parser.add_argument("--families", type=int, default=2, help="number of disconnected families")
+    parser.add_argument("--queries", type=int, default=200, help="queries per query type")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["prolog", "graph", "differential"], default="prolog",
+                        help="backend of the main target")
+    parser.add_argument("--target", choices=[*TARGETS, "both"], default="both")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    config = {
+        "depth": args.depth,
+        "branching": args.branching,
+        "sibling_group": args.sibling_group,
+        "families": args.families,
+        "queries": args.queries,
+        "seed": args.seed,
+        "backend": args.backend,
+    }
+    tree = FamilyTree(args.depth, args.branching, args.sibling_group, args.families, args.seed)
+    report = {
+        "config": config,
+        "people": tree.size,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": [],
+    }
+
+    if args.target == "both":
+        config_argv = [f"--{key.replace('_', '-')}={value}" for key, value in config.items()]
+        report["runs"] = [run_isolated(target, config_argv) for target in TARGETS]
+    else:
+        report["runs"] = [run_target(args.target, tree, args.queries, args.backend)]
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
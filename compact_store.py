@@ -0,0 +1,226 @@
+"""Compact, read-only copy of the family facts for very large bases.
+
+FamilyIndex keeps dicts of sets, over a kilobyte per person. This
+store holds the same facts in flat arrays:
+
+    names           one UTF-8 blob with array('I') offsets, and the IDs
+                    in name order for lookups by binary search
+    genders         one byte per person (family_index.GENDER_CODES)
+    parents         CSR: parent_ids[parent_offsets[p]:parent_offsets[p + 1]]
+    children        CSR, the same way
+    sibling groups  a group number per person, members in CSR form
+
+That is about 40 bytes per person besides names. IDs match those of the
+FamilyIndex a store is built from. The arrays cannot grow; build a new
+store after learning facts.
+"""
+from array import array
+from bisect import bisect_left
+
+from family_index import GENDER_CODES, GENDERS
+
+# group_of value of people in no sibling group
+NO_GROUP = 0xFFFFFFFF
+
+
+class PersonRecord:
+    """One person of a CompactFamilyStore, created on demand."""
+
+    __slots__ = ("id", "name", "gender")
+
+    def __init__(self, person, name, gender):
+        self.id = person
+        self.name = name
+        self.gender = gender
+
+    def __repr__(self):
+        return f"PersonRecord({self.id!r}, {self.name!r}, {self.gender!r})"
+
+
+class _NameOrder:
+    """Names in sorted order, as a sequence for bisect."""
+
+    __slots__ = ("store",)
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store.by_name)
+
+    def __getitem__(self, position):
+        return self.store.name(self.store.by_name[position])
+
+
+def _csr(size, sources, targets):
+    """Group (source, target) edges by source: return (offsets, ids)."""
+    offsets = array("I", bytes(4 * (size + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for person in range(size):
+        offsets[person + 1] += offsets[person]
+    ids = array("I", bytes(4 * len(targets)))
+    fill = array("I", offsets[:-1])
+    for source, target in zip(sources, targets):
+        ids[fill[source]] = target
+        fill[source] += 1
+    return offsets, ids
+
+
+class CompactFamilyStore:
+    """Names, genders, parent/child edges and sibling groups in arrays."""
+
+    __slots__ = ("name_blob", "name_offsets", "by_name", "genders",
+                 "parent_offsets", "parent_ids", "child_offsets", "child_ids",
+                 "group_of", "group_offsets", "group_members")
+
+    def __init__(self, names, genders, edges, groups):
+        """Build the arrays from data indexed by person ID.
+
+        names and genders (codes) are in ID order, edges are (parent,
+        child) pairs and groups the member lists of sibling groups.
+        """
+        size = len(names)
+        encoded = [name.encode("utf-8") for name in names]
+        self.name_blob = b"".join(encoded)
+        self.name_offsets = array("I", [0])
+        for name in encoded:
+            self.name_offsets.append(self.name_offsets[-1] + len(name))
+        self.by_name = array("I", sorted(range(size), key=encoded.__getitem__))
+        self.genders = bytes(genders)
+
+        parents = array("I", (parent for parent, _ in edges))
+        children = array("I", (child for _, child in edges))
+        self.parent_offsets, self.parent_ids = _csr(size, children, parents)
+        self.child_offsets, self.child_ids = _csr(size, parents, children)
+
+        self.group_of = array("I", [NO_GROUP]) * size
+        self.group_offsets = array("I", [0])
+        self.group_members = array("I")
+        for members in groups:
+            if len(members) < 2:
+                continue
+            for person in members:
+                self.group_of[person] = len(self.group_offsets) - 1
+            self.group_members.extend(members)
+            self.group_offsets.append(len(self.group_members))
+
+    @classmethod
+    def from_index(cls, index):
+        """Snapshot a FamilyIndex."""
+        edges = [(parent, child) for child, parents in index.parents.items() for parent in parents]
+        return cls(index.people.names, index.gender_codes, edges, index.sibling_groups())
+
+    @classmethod
+    def from_facts(cls, facts):
+        """Build from (predicate, names) facts without a FamilyIndex.
+
+        Only parent/2, siblings_direct/2, male/1 and female/1 are used.
+        """
+        ids = {}
+        names = []
+        genders = bytearray()
+        edges = {}
+        links = []
+
+        def intern(name):
+            person = ids.get(name)
+            if person is None:
+                person = ids[name] = len(names)
+                names.append(name)
+                genders.append(0)
+            return person
+
+        for predicate, args in facts:
+            if predicate == "parent":
+                edges[tuple(map(intern, args))] = None
+            elif predicate == "siblings_direct":
+                links.append(tuple(map(intern, args)))
+            elif predicate in GENDER_CODES:
+                person = intern(args[0])
+                if not genders[person]:
+                    genders[person] = GENDER_CODES[predicate]
+        del ids
+
+        # Sibling groups: siblings_direct links plus children sharing a
+        # parent (see sibling_link/2), merged with a union-find array
+        size = len(genders)
+        roots = array("I", range(size))
+
+        def find(person):
+            while roots[person] != person:
+                roots[person] = roots[roots[person]]
+                person = roots[person]
+            return person
+
+        first_child = {}
+        for parent, child in edges:
+            links.append((first_child.setdefault(parent, child), child))
+        for person1, person2 in links:
+            roots[find(person1)] = find(person2)
+        linked = set()
+        for person1, person2 in links:
+            linked.update((person1, person2))
+        groups = {}
+        for person in sorted(linked):
+            groups.setdefault(find(person), []).append(person)
+        return cls(names, genders, list(edges), groups.values())
+
+    def __len__(self):
+        return len(self.genders)
+
+    def name(self, person):
+        start, end = self.name_offsets[person], self.name_offsets[person + 1]
+        return self.name_blob[start:end].decode("utf-8")
+
+    def lookup(self, name):
+        """Return the ID of a name, or None."""
+        position = bisect_left(_NameOrder(self), name)
+        if position < len(self.by_name) and self.name(self.by_name[position]) == name:
+            return self.by_name[position]
+        return None
+
+    def gender(self, person):
+        """Return "male", "female" or None for a person ID."""
+        return GENDERS[self.genders[person]]
+
+    def parents(self, person):
+        return self.parent_ids[self.parent_offsets[person]:self.parent_offsets[person + 1]]
+
+    def children(self, person):
+        return self.child_ids[self.child_offsets[person]:self.child_offsets[person + 1]]
+
+    def siblings(self, person):
+        """Return the other members of a person's sibling group."""
+        group = self.group_of[person]
+        if group == NO_GROUP:
+            return []
+        members = self.group_members[self.group_offsets[group]:self.group_offsets[group + 1]]
+        return [member for member in members if member != person]
+
+    def person(self, person):
+        """Return a PersonRecord for a person ID."""
+        return PersonRecord(person, self.name(person), self.gender(person))
+
+    def get_all_parents(self, child):
+        """main.get_all_parents() over the store."""
+        person = self.lookup(child.lower())
+        return [] if person is None else [self.name(parent) for parent in self.parents(person)]
+
+    def get_gender(self, name):
+        """main.get_gender() over the store."""
+        person = self.lookup(name.lower())
+        return None if person is None else self.gender(person)
+
+    def nbytes(self):
+        """Return (bytes of the names, bytes of everything else)."""
+        names = len(self.name_blob) + _array_bytes(self.name_offsets)
+        rest = sum(_array_bytes(getattr(self, slot)) for slot in self.__slots__[2:])
+        return names, rest
+
+
+def _array_bytes(values):
+    if isinstance(values, array):
+        return values.itemsize * len(values)
+    return len(values)
+
@@ -0,0 +1,400 @@
+"""In-memory mirror of the family facts asserted from main.py.
+
+Prolog stays the source of truth for the rules in relationship.pl; this
+index answers the structural questions main.py asks most often (cycle
+checks, sibling groups and the relations built on them) so they do not
+need a Prolog round-trip per person.
+
+Names are interned once into dense integer IDs; every index below is
+keyed by ID, and the name and gender tables are arrays indexed by ID.
+
+The derived relations grandparent/2, aunt_or_uncle/2 and cousin/2 are
+materialized views: each new parent link or sibling-group merge adds
+just the pairs it creates, so answering them is a set lookup.
+
+Every person's ancestors are cached with their generation distance,
+which also answers kinship at any distance (kinship(), common_ancestors()).
+"""
+
+# Gender codes stored in FamilyIndex.gender_codes; 0 means unknown
+GENDERS = (None, "male", "female")
+GENDER_CODES = {"male": 1, "female": 2}
+
+
+class PersonRegistry:
+    """Interns names into dense integer IDs; names[id] maps them back."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self):
+        self.ids.clear()
+        self.names.clear()
+
+    def intern(self, name):
+        """Return the ID of a name, assigning the next free one if needed."""
+        person = self.ids.get(name)
+        if person is None:
+            person = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return person
+
+    def lookup(self, name):
+        """Return the ID of a known name, or None."""
+        return self.ids.get(name)
+
+
+class PairTable:
+    """A set of (person, person) pairs indexed in both directions."""
+
+    __slots__ = ("forward", "backward", "size")
+
+    def __init__(self):
+        self.forward = {}
+        self.backward = {}
+        self.size = 0
+
+    def __contains__(self, pair):
+        person1, person2 = pair
+        return person2 in self.forward.get(person1, ())
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.forward.clear()
+        self.backward.clear()
+        self.size = 0
+
+    def add(self, person1, person2):
+        targets = self.forward.setdefault(person1, set())
+        if person2 not in targets:
+            targets.add(person2)
+            self.backward.setdefault(person2, set()).add(person1)
+            self.size += 1
+
+
+# Derived relations kept as views
+VIEWS = ("grandparent", "aunt_or_uncle", "cousin")
+
+# Relations that are a base relation restricted to one gender of the
+# first argument, e.g. father(X, Y) :- male(X), parent(X, Y).
+GENDERED = {
+    "brother": ("siblings", "male"),
+    "sister": ("siblings", "female"),
+    "father": ("parent", "male"),
+    "mother": ("parent", "female"),
+    "son": ("child", "male"),
+    "daughter": ("child", "female"),
+    "grandfather": ("grandparent", "male"),
+    "grandmother": ("grandparent", "female"),
+    "uncle": ("aunt_or_uncle", "male"),
+    "aunt": ("aunt_or_uncle", "female"),
+}
+
+# Every relation holds() and related() can answer
+RELATIONS = frozenset(["siblings", "parent", "child", *VIEWS, *GENDERED])
+
+
+class FamilyIndex:
+    """Adjacency sets, sibling groups and genders kept in sync with Prolog."""
+
+    def __init__(self):
+        self.people = PersonRegistry()
+        self.parents = {}
+        self.children = {}
+        self.gender_codes = bytearray()
+        # Explicitly asserted facts of the other relations, e.g. uncle(X, Y),
+        # as a PairTable per predicate
+        self.facts = {}
+        # Cached {ancestor: generations up} per person. If a person is
+        # cached, so are all of their ancestors, which keeps invalidation
+        # a downward walk.
+        self._ancestors = {}
+        # Disjoint-set forest over sibling groups, with each root's members
+        self._group_parent = {}
+        self._group_members = {}
+        self.views = {view: PairTable() for view in VIEWS}
+
+    def clear(self):
+        self.people.clear()
+        self.parents.clear()
+        self.children.clear()
+        self.gender_codes.clear()
+        self.facts.clear()
+        self._ancestors.clear()
+        self._group_parent.clear()
+        self._group_members.clear()
+        for view in self.views.values():
+            view.clear()
+
+    def intern(self, name):
+        person = self.people.intern(name)
+        if person == len(self.gender_codes):
+            self.gender_codes.append(0)
+        return person
+
+    def name(self, person):
+        return self.people.names[person]
+
+    def gender(self, person):
+        """Return "male", "female" or None for a person ID."""
+        return GENDERS[self.gender_codes[person]]
+
+    def add_fact(self, predicate, *names):
+        """Record a fact asserted into Prolog."""
+        people = tuple(self.intern(name) for name in names)
+        if predicate == "parent":
+            self.add_parent(*people)
+        elif predicate == "siblings_direct":
+            self.union_siblings(*people)
+        elif predicate in GENDER_CODES:
+            if not self.gender_codes[people[0]]:
+                self.gender_codes[people[0]] = GENDER_CODES[predicate]
+        else:
+            self.facts.setdefault(predicate, PairTable()).add(*people)
+
+    def add_parent(self, parent, child):
+        """Record parent(parent, child)."""
+        siblings = self.children.setdefault(parent, set())
+        if child in siblings:
+            return
+        # Children of the same parent are siblings (see sibling_link/2).
+        # Groups are merged transitively, so half-siblings through
+        # different parents end up in one group, as in siblings/2.
+        if siblings:
+            self.union_siblings(child, next(iter(siblings)))
+        self._add_parent_pairs(parent, child)
+        siblings.add(child)
+        self.parents.setdefault(child, set()).add(parent)
+        self._invalidate(child)
+
+    def _invalidate(self, person):
+        """Drop the cached ancestors of a person and their descendants."""
+        stack = [person]
+        while stack:
+            current = stack.pop()
+            if self._ancestors.pop(current, None) is not None:
+                stack.extend(self.children.get(current, ()))
+
+    def ancestors(self, person):
+        """Return the set of all ancestors of a person."""
+        return self.ancestor_depths(person).keys()
+
+    def ancestor_depths(self, person):
+        """Return {ancestor: generations up, along the shortest line}."""
+        cached = self._ancestors.get(person)
+        if cached is not None:
+            return cached
+
+        # Iterative post-order walk so deep pedigrees do not hit the
+        # recursion limit; every visited person ends up cached.
+        stack = [person]
+        while stack:
+            current = stack[-1]
+            parents = self.parents.get(current, ())
+            missing = [parent for parent in parents if parent not in self._ancestors]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if current not in self._ancestors:
+                result = dict.fromkeys(parents, 1)
+                for parent in parents:
+                    for ancestor, depth in self._ancestors[parent].items():
+                        if result.get(ancestor, depth + 2) > depth + 1:
+                            result[ancestor] = depth + 1
+                self._ancestors[current] = result
+        return self._ancestors[person]
+
+    def is_ancestor(self, ancestor, person):
+        """Check if ancestor is reachable from person through parent links."""
+        return ancestor in self.ancestors(person)
+
+    def common_ancestors(self, person1, person2):
+        """Return {ancestor: (generations up from person1, from person2)}.
+
+        A person counts as their own ancestor at distance 0, so an
+        ancestor of the other person is included.
+        """
+        depths1 = {person1: 0, **self.ancestor_depths(person1)}
+        depths2 = {person2: 0, **self.ancestor_depths(person2)}
+        if len(depths1) > len(depths2):
+            return {ancestor: (depths1[ancestor], depth)
+                    for ancestor, depth in depths2.items() if ancestor in depths1}
+        return {ancestor: (depth, depths2[ancestor])
+                for ancestor, depth in depths1.items() if ancestor in depths2}
+
+    def kinship(self, person1, person2):
+        """Return the generations (up1, up2) to the nearest common ancestor.
+
+        The result is None for people who are not related. A sibling
+        group counts as a common ancestor one generation above its
+        members, since siblings/2 also links people without a known
+        shared parent. (1, 1) are siblings, (1, 2) aunt or uncle and
+        nephew or niece, (2, 2) first cousins, and so on.
+        """
+        lines1, lines2 = self._lines(person1), self._lines(person2)
+        best = None
+        for node, up1 in lines1.items():
+            up2 = lines2.get(node)
+            if up2 is not None and (best is None or (up1 + up2, abs(up1 - up2))
+                                    < (best[0] + best[1], abs(best[0] - best[1]))):
+                best = (up1, up2)
+        return best
+
+    def _lines(self, person):
+        """Return {node: generations up} for kinship().
+
+        The nodes are the person, their ancestors and the sibling groups
+        of all of them, written ("group", root).
+        """
+        lines = {person: 0, **self.ancestor_depths(person)}
+        for node, depth in list(lines.items()):
+            if len(self.group_members(node)) > 1:
+                group = ("group", self.find_group(node))
+                if lines.get(group, depth + 2) > depth + 1:
+                    lines[group] = depth + 1
+        return lines
+
+    def find_group(self, person):
+        """Return the representative of a person's sibling group."""
+        root = person
+        while self._group_parent.get(root, root) != root:
+            root = self._group_parent[root]
+        # Path compression
+        while person != root:
+            next_person = self._group_parent[person]
+            self._group_parent[person] = root
+            person = next_person
+        return root
+
+    def union_siblings(self, person1, person2):
+        """Merge the sibling groups of two people."""
+        for person in (person1, person2):
+            if person not in self._group_parent:
+                self._group_parent[person] = person
+                self._group_members[person] = [person]
+        root1, root2 = self.find_group(person1), self.find_group(person2)
+        if root1 == root2:
+            return
+        if len(self._group_members[root1]) < len(self._group_members[root2]):
+            root1, root2 = root2, root1
+        members = self._group_members.pop(root2)
+        self._add_sibling_pairs(self._group_members[root1], members)
+        self._group_parent[root2] = root1
+        self._group_members[root1].extend(members)
+
+    def group_members(self, person):
+        """Return everyone in a person's sibling group, the person included."""
+        if person not in self._group_parent:
+            return [person]
+        return self._group_members[self.find_group(person)]
+
+    def sibling_groups(self):
+        """Return the member lists of all sibling groups."""
+        return list(self._group_members.values())
+
+    def _add_parent_pairs(self, parent, child):
+        """Add the view pairs created by a new parent(parent, child) link."""
+        grandparent = self.views["grandparent"]
+        aunt_or_uncle = self.views["aunt_or_uncle"]
+        cousin = self.views["cousin"]
+        for grand in self.parents.get(parent, ()):
+            grandparent.add(grand, child)
+        for grandchild in self.children.get(child, ()):
+            grandparent.add(parent, grandchild)
+        for sibling in self.group_members(parent):
+            if sibling == parent:
+                continue
+            aunt_or_uncle.add(sibling, child)
+            for other in self.children.get(sibling, ()):
+                if other != child:
+                    cousin.add(child, other)
+                    cousin.add(other, child)
+
+    def _add_sibling_pairs(self, group1, group2):
+        """Add the view pairs created by merging two sibling groups."""
+        aunt_or_uncle = self.views["aunt_or_uncle"]
+        cousin = self.views["cousin"]
+        for person1 in group1:
+            children1 = self.children.get(person1, ())
+            for person2 in group2:
+                children2 = self.children.get(person2, ())
+                for child in children2:
+                    aunt_or_uncle.add(person1, child)
+                for child in children1:
+                    aunt_or_uncle.add(person2, child)
+                    for other in children2:
+                        if other != child:
+                            cousin.add(child, other)
+                            cousin.add(other, child)
+
+    def siblings(self, person1, person2):
+        """siblings/2: two different people in the same sibling group."""
+        return (
+            person1 != person2
+            and person1 in self._group_parent
+            and person2 in self._group_parent
+            and self.find_group(person1) == self.find_group(person2)
+        )
+
+    def has_fact(self, predicate, person1, person2):
+        facts = self.facts.get(predicate)
+        return facts is not None and (person1, person2) in facts
+
+    def _base_holds(self, relation, person1, person2):
+        if relation == "siblings":
+            return self.siblings(person1, person2)
+        if relation == "parent":
+            return person1 in self.parents.get(person2, ())
+        if relation == "child":
+            return person2 in self.parents.get(person1, ())
+        # grandfather/2 and grandmother/2 also see asserted grandparent/2 facts
+        if relation == "grandparent" and self.has_fact(relation, person1, person2):
+            return True
+        return (person1, person2) in self.views[relation]
+
+    def _base_related(self, relation, person):
+        if relation == "siblings":
+            return {member for member in self.group_members(person) if member != person}
+        if relation == "parent":
+            return set(self.parents.get(person, ()))
+        if relation == "child":
+            return set(self.children.get(person, ()))
+        result = set(self.views[relation].backward.get(person, ()))
+        if relation == "grandparent" and relation in self.facts:
+            result |= self.facts[relation].backward.get(person, set())
+        return result
+
+    def holds(self, relation, person1, person2):
+        """Evaluate relation(person1, person2) as relationship.pl would.
+
+        person1 and person2 are person IDs, like everywhere else in the index.
+        Facts asserted for the relation itself count as well.
+        """
+        if relation not in RELATIONS:
+            raise KeyError(relation)
+        if self.has_fact(relation, person1, person2):
+            return True
+        base, gender = GENDERED.get(relation, (relation, None))
+        if gender and self.gender(person1) != gender:
+            return False
+        return self._base_holds(base, person1, person2)
+
+    def related(self, relation, person):
+        """Return the set of IDs X for which relation(X, person) holds."""
+        if relation not in RELATIONS:
+            raise KeyError(relation)
+        base, gender = GENDERED.get(relation, (relation, None))
+        result = self._base_related(base, person)
+        if gender:
+            result = {other for other in result if self.gender(other) == gender}
+        facts = self.facts.get(relation)
+        if facts is not None:
+            result |= facts.backward.get(person, set())
+        return result
@@ -65,7 +65,7 @@ grandfather(X, Y) :- male(X), father(X, Z), (parent(Z, Y); mother(Z, Y); father(
 grandmother(X, Y) :- female(X), mother(X, Z), (parent(Z, Y); mother(Z, Y); father(Z, Y)).
 
 % Grandchild relationships
-grandchild(X, Y) :- child(X, Z), grandparent(Y, Z).
+grandchild(X, Y) :- grandparent(Y, X).
 
 % Uncle and Aunt relationships
 uncle(X, Y) :- male(X), brother(X, Z), (parent(Z, Y); mother(Z, Y); father(Z, Y)).
@@ -124,3 +124,26 @@ learn_fact(Fact) :-
     \+ contradiction,
     assert(Fact). % Add a fact dynamically if it's logically valid.
 
+
+% Run Goal, raising time_limit_exceeded after Ms milliseconds. Used by
+% prolog_terms.py, whose C interface cannot pass floats.
+call_within_ms(Ms, Goal) :-
+    Seconds is Ms / 1000,
+    call_with_time_limit(Seconds, Goal).
+
+% Sorted, duplicate-free answers X of Relation(X, Subject); [] if none
+relation_set(Relation, Subject, Set) :-
+    (   setof(X, call(Relation, X, Subject), Set)
+    ->  true
+    ;   Set = []
+    ).
+
+% relation_set/3 for every subject of a list, in one call
+relation_sets(Relation, Subjects, Sets) :-
+    maplist(relation_set(Relation), Subjects, Sets).
+
+% The relations R of a list with R(X, Y) (Forward) and with R(Y, X)
+% (Backward), each checked up to its first solution
+relations_between(Relations, X, Y, Forward, Backward) :-
+    findall(R, (member(R, Relations), once(call(R, X, Y))), Forward),
+    findall(R, (member(R, Relations), once(call(R, Y, X))), Backward).
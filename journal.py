@@ -0,0 +1,145 @@
+"""Append-only journal and snapshots of the facts learned at runtime.
+
+Journal lines are "+fact" for an assertz and "-fact" for a retract. A
+snapshot is a consultable .pl file holding every fact at the time it
+was written. Startup consults the snapshot and replays only the journal
+lines written since.
+"""
+import os
+
+from kb_loader import load_rules
+
+SNAPSHOT_FILE = "snapshot.pl"
+JOURNAL_FILE = "journal.log"
+
+# Journal lines written between fsync calls
+SYNC_EVERY = 100
+
+# Journal lines after which the journal is folded into a new snapshot
+SNAPSHOT_EVERY = 10000
+
+
+def fact_indicator(fact):
+    """Return the name/arity indicator of a fact like parent(a, b)."""
+    name, _, args = fact.partition("(")
+    return f"{name}/{args.count(',') + 1}"
+
+
+def parse_fact(fact):
+    """Split a fact like parent(a, b) into ("parent", ("a", "b"))."""
+    name, _, args = fact.partition("(")
+    return name, tuple(arg.strip() for arg in args.rstrip(")").split(","))
+
+
+def read_snapshot(path):
+    """Return the facts of a snapshot file, in order."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as stream:
+        return [
+            line.rstrip()[:-1]
+            for line in stream
+            if line.strip() and not line.startswith((":-", "%"))
+        ]
+
+
+def write_snapshot(path, facts):
+    """Atomically write facts as a consultable Prolog file."""
+    indicators = sorted({fact_indicator(fact) for fact in facts})
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as stream:
+        stream.write("% Snapshot of learned facts, written by journal.py\n")
+        # The rule files own these predicates; multifile keeps consult
+        # from wiping their clauses (or ours) when either file is loaded.
+        for indicator in indicators:
+            stream.write(f":- multifile {indicator}.\n")
+        for fact in facts:
+            stream.write(f"{fact}.\n")
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(temporary, path)
+
+
+class FactJournal:
+    """Append-only log of learned facts with periodic snapshots."""
+
+    def __init__(self, directory, sync_every=SYNC_EVERY, snapshot_every=SNAPSHOT_EVERY):
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.sync_every = sync_every
+        self.snapshot_every = snapshot_every
+        self._drop_torn_line()
+        self.entries = len(self.read_journal())
+        self._unsynced = 0
+        self._stream = open(self.journal_path, "a", encoding="utf-8")
+
+    def _drop_torn_line(self):
+        """Cut off a partial last line left by a crash."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as stream:
+            data = stream.read()
+            if data and not data.endswith(b"\n"):
+                stream.truncate(data.rfind(b"\n") + 1)
+
+    def read_journal(self):
+        """Return the journal as a list of (op, fact) pairs."""
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, encoding="utf-8") as stream:
+            return [(line[0], line[1:-1]) for line in stream if line.endswith("\n")]
+
+    def record(self, fact, retract=False):
+        """Append an asserted (or retracted) fact to the journal."""
+        self._stream.write(("-" if retract else "+") + fact + "\n")
+        self.entries += 1
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+        if self.entries >= self.snapshot_every:
+            self.compact()
+
+    def sync(self):
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._unsynced = 0
+
+    def facts(self):
+        """Fold the snapshot and the journal into the current facts."""
+        facts = dict.fromkeys(read_snapshot(self.snapshot_path))
+        for op, fact in self.read_journal():
+            if op == "+":
+                facts[fact] = None
+            else:
+                facts.pop(fact, None)
+        return list(facts)
+
+    def compact(self):
+        """Write a new snapshot and start an empty journal."""
+        self.sync()
+        write_snapshot(self.snapshot_path, self.facts())
+        self._stream.close()
+        self._stream = open(self.journal_path, "w", encoding="utf-8")
+        self.entries = 0
+
+    def close(self):
+        if self.entries:
+            self.compact()
+        self._stream.close()
+
+    def load(self, prolog, chunk_size=500):
+        """Consult the snapshot, then replay the journal tail into Prolog."""
+        snapshot = read_snapshot(self.snapshot_path)
+        if snapshot:
+            load_rules(prolog, self.snapshot_path)
+        # Replay the difference rather than the raw lines, so a crash
+        # between writing a snapshot and truncating the journal does not
+        # assert anything twice.
+        current = self.facts()
+        loaded = set(snapshot)
+        wanted = set(current)
+        goals = [f"retract({fact})" for fact in snapshot if fact not in wanted]
+        goals += [f"assertz({fact})" for fact in current if fact not in loaded]
+        for start in range(0, len(goals), chunk_size):
+            list(prolog.query(", ".join(goals[start:start + chunk_size])))
@@ -0,0 +1,82 @@
+"""Lazy SWI-Prolog startup and quick-load (.qlf) rule files.
+
+Build step: compile the rule files (and a saved fact snapshot) with
+
+    python kb_loader.py relationship.pl family_kb.pl data/snapshot.pl
+
+load_rules() then picks the .qlf over the source while it is up to date.
+"""
+import argparse
+import os
+import threading
+
+from prolog_terms import goal_exists
+
+
+def compiled_path(source):
+    """Return the quick-load file that qcompile/1 writes for a source."""
+    return os.path.splitext(source)[0] + ".qlf"
+
+
+def load_rules(prolog, source):
+    """Consult a Prolog file, using its .qlf when newer than the source."""
+    compiled = compiled_path(source)
+    if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(source):
+        try:
+            prolog.consult(compiled)
+            return
+        except Exception as e:
+            # e.g. a .qlf written by another SWI-Prolog version
+            print(f"Ignoring {compiled}: {e}")
+    prolog.consult(source)
+
+
+def compile_rules(prolog, source):
+    """Write the .qlf file for a Prolog source file, using a started engine.
+
+    The path goes to qcompile/1 as an atom term, so no quoting is needed.
+    """
+    if not goal_exists("qcompile", source):
+        raise RuntimeError(f"qcompile failed for {source}")
+
+
+class LazyProlog:
+    """Stand-in for pyswip's Prolog that starts SWI-Prolog on first use.
+
+    Importing pyswip boots the Prolog runtime, so both the import and the
+    consult of the rule files are deferred until a query needs them.
+    """
+
+    def __init__(self, *sources):
+        self.sources = sources
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.start(), name)
+
+    def start(self):
+        """Start SWI-Prolog and load the rule files, once."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from pyswip import Prolog
+
+                    engine = Prolog()
+                    for source in self.sources:
+                        load_rules(engine, source)
+                    self._engine = engine
+        return self._engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile Prolog files to quick-load format.")
+    parser.add_argument("sources", nargs="+", help="Prolog files to compile")
+    args = parser.parse_args()
+
+    from pyswip import Prolog
+
+    prolog = Prolog()
+    for source in args.sources:
+        compile_rules(prolog, source)
+        print(f"Compiled {compiled_path(source)}")
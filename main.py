@@ -1,8 +1,41 @@
+import argparse
 import re
-from pyswip import Prolog
+import sys
+import threading
+from collections import OrderedDict
+from backends import GRAPH_RELATIONS, DifferentialBackend, GraphBackend, PrologBackend
+from compact_store import CompactFamilyStore
+from family_index import FamilyIndex
+from journal import FactJournal
+from kb_loader import LazyProlog
+from profiling import profiler
+from prolog_terms import QueryAborted
+from results import (ANSWERED, DUPLICATE, FAILED, IMPOSSIBLE, LEARNED, PROLOG, REJECTED,
+                     Result)
 
-prolog = Prolog()
-prolog.consult("relationship.pl")
+RULES_FILE = "relationship.pl"
+
+# SWI-Prolog starts and loads the rules on the first query
+prolog = LazyProlog(RULES_FILE)
+
+# Python-side mirror of the asserted family facts
+family_index = FamilyIndex()
+
+# The rules of relationship.pl evaluated over family_index
+index_rules = GraphBackend(family_index)
+
+# Append-only log of learned facts, set up by open_journal()
+journal = None
+
+# pyswip allows one open text query (Prolog.query) at a time across all
+# threads; term-based goals from prolog_terms do not need this lock.
+prolog_lock = threading.RLock()
+
+# Engine answering the goals the index does not; see use_backend()
+backend = PrologBackend(prolog, RULES_FILE, prolog_lock)
+
+# Names accepted by use_backend() and --backend
+BACKENDS = ("prolog", "graph", "differential")
 
 RELATIONSHIPS = {
     "siblings": {},
@@ -23,53 +56,337 @@ RELATIONSHIPS = {
     "relative": {}
 }
 
-def execute_query(query):
-    """Run a Prolog query and return results."""
-    try:
-        return list(prolog.query(query))
-    except Exception as e:
-        print(f"Error: {e}")
-        return []
+# "Who" question labels of every relation, as (singular, plural)
+WHO_LABELS = {
+    "siblings": ("sibling", "siblings"),
+    "sister": ("sister", "sisters"),
+    "brother": ("brother", "brothers"),
+    "mother": ("mother", "mothers"),
+    "father": ("father", "fathers"),
+    "parent": ("parent", "parents"),
+    "child": ("child", "children"),
+    "daughter": ("daughter", "daughters"),
+    "son": ("son", "sons"),
+    "grandmother": ("grandmother", "grandmothers"),
+    "grandfather": ("grandfather", "grandfathers"),
+    "aunt": ("aunt", "aunts"),
+    "uncle": ("uncle", "uncles"),
+    "cousin": ("cousin", "cousins"),
+    "grandchild": ("grandchild", "grandchildren"),
+    "relative": ("relative", "relatives"),
+}
+
+# Words for kinship terms, as (unknown gender, male, female)
+KINSHIP_WORDS = {
+    "parent": ("parent", "father", "mother"),
+    "child": ("child", "son", "daughter"),
+    "sibling": ("sibling", "brother", "sister"),
+    "aunt_or_uncle": ("aunt or uncle", "uncle", "aunt"),
+    "niece_or_nephew": ("niece or nephew", "nephew", "niece"),
+}
+
+ORDINALS = ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"]
+
+# Facts committed per Prolog call in batch mode
+BATCH_SIZE = 500
+
+# Results kept by the query cache
+QUERY_CACHE_SIZE = 4096
+
+# Relations whose yes/no questions are answered from the Python-side
+# index and its views instead of the backend, through index_rules
+INDEXED_RELATIONS = {"siblings", "brother", "sister", "uncle", "aunt", "aunt_or_uncle",
+                     "cousin", "grandparent", "grandfather", "grandmother"}
+
+# Relations whose "who" questions are answered from the index
+INDEXED_WHO_RELATIONS = GRAPH_RELATIONS
+
+# Predicates whose asserted facts are mirrored in the index
+INDEXED_FACTS = ["parent/2", "siblings_direct/2", "male/1", "female/1",
+                 "child/2", "son/2", "daughter/2", "uncle/2", "aunt/2",
+                 "cousin/2", "grandparent/2", "grandfather/2", "grandmother/2"]
+
+class DuplicateRelation(ValueError):
+    """Raised when an asserted relationship is already known."""
+
+
+class FactBatch:
+    """Facts queued for a single assertz round-trip per chunk.
+
+    Queued facts are already in family_index; they reach the journal
+    only once the backend has them. If the backend fails, the index is
+    reseeded from the backend so that both agree again.
+    """
+
+    def __init__(self):
+        self.open = False
+        self.facts = []
+
+    def add(self, predicate, names):
+        self.facts.append((predicate, names))
+
+    def flush(self):
+        """Commit the queued facts to the backend in one call."""
+        if self.facts:
+            facts = self.facts
+            self.facts = []
+            try:
+                with profiler.span("assertz", "batch", prolog_call=True) as span:
+                    backend.assert_facts(facts)
+                    span.solutions = len(facts)
+            except Exception:
+                rebuild_index()
+                raise
+            finally:
+                query_cache.invalidate()
+            if journal:
+                for predicate, names in facts:
+                    journal.record(format_fact(predicate, names))
+
+
+fact_batch = FactBatch()
+
+
+class QueryCache:
+    """LRU cache of query results, keyed on the goal as a tuple.
+
+    Every entry remembers the fact generation it was computed in. Any
+    change to the knowledge base bumps the generation, which makes all
+    older entries stale.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != self.generation:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, results):
+        with self.lock:
+            self.entries[key] = (self.generation, results)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "generation": self.generation,
+        }
+
+
+query_cache = QueryCache()
+
+
+def format_fact(predicate, names):
+    """Return a fact as the journal writes it, e.g. parent(ann, bob)."""
+    return f"{predicate}({', '.join(names)})"
+
+def add_fact(predicate, *names):
+    """Assert a fact, or queue it while a batch is open."""
+    if fact_batch.open:
+        fact_batch.add(predicate, names)
+    else:
+        with profiler.span("assertz", predicate, prolog_call=True):
+            backend.assert_facts([(predicate, names)])
+        if journal:
+            journal.record(format_fact(predicate, names))
+    family_index.add_fact(predicate, *names)
+    query_cache.invalidate()
+
+def relation_exists(predicate, *names):
+    """Check if a ground goal has a solution, stopping at the first one."""
+    fact_batch.flush()
+    key = (predicate, *names)
+    exists = query_cache.get(key)
+    if exists is not None:
+        return exists
+    with profiler.span("exists", predicate, prolog_call=True) as span:
+        exists = backend.exists(predicate, *names)
+        span.solutions = int(exists)
+    query_cache.put(key, exists)
+    return exists
 
 def is_existing_relation(relation, name1, name2=None):
     """Check if a specific relationship exists."""
     name1, name2 = name1.lower(), (name2.lower() if name2 else None)
-    query = f"{relation}({name1}, {name2})" if name2 else f"{relation}({name1})"
-    return bool(execute_query(query))
+    if name2 and relation in INDEXED_RELATIONS and relation in backend.index_relations:
+        person1 = family_index.people.lookup(name1)
+        person2 = family_index.people.lookup(name2)
+        if person1 is None or person2 is None:
+            return False
+        return index_rules.holds(relation, person1, person2)
+    if name2:
+        return relation_exists(relation, name1, name2)
+    return relation_exists(relation, name1)
+
+
+def who_bulk(relation, names):
+    """Return {name: sorted names X with relation(X, name)} for many people.
+
+    Relations in INDEXED_WHO_RELATIONS are read from the index; the others
+    are answered by the backend in one call for the whole list (one
+    setof/3 round-trip on Prolog).
+    """
+    lowered = [name.lower() for name in names]
+    if relation in INDEXED_WHO_RELATIONS and relation in backend.index_relations:
+        answers = []
+        for name in lowered:
+            person = family_index.people.lookup(name)
+            related = () if person is None else index_rules.related(relation, person)
+            answers.append([family_index.name(other) for other in related])
+    else:
+        fact_batch.flush()
+        with profiler.span("who", relation, prolog_call=True) as span:
+            answers = backend.relation_sets(relation, lowered)
+            span.solutions = sum(map(len, answers))
+    return {name: sorted(other.capitalize() for other in related)
+            for name, related in zip(names, answers)}
+
+def who(relation, name):
+    """Return the sorted names X for which relation(X, name) holds."""
+    return who_bulk(relation, [name])[name]
 
+def iter_who(relation, names=None, chunk_size=BATCH_SIZE):
+    """Stream (name, answers) pairs, one round-trip per chunk of names.
+
+    Without names, everyone the index knows about is covered.
+    """
+    if names is None:
+        names = [name.capitalize() for name in list(family_index.people.names)]
+    chunk = []
+    for name in names:
+        chunk.append(name)
+        if len(chunk) >= chunk_size:
+            yield from who_bulk(relation, chunk).items()
+            chunk = []
+    if chunk:
+        yield from who_bulk(relation, chunk).items()
 
 def get_all_parents(child):
     """Retrieve all parents of a given child."""
-    query = f"parent(X, {child.lower()})"
-    results = execute_query(query)
-    return [result["X"] for result in results]
+    person = family_index.people.lookup(child.lower())
+    if person is None:
+        return []
+    return [family_index.name(parent) for parent in family_index.parents.get(person, ())]
 
 def detect_cycle(name1, name2):
     """
-    Detect if adding a parent-child relationship would create a cycle.
+    Detect if adding name1 as a parent of name2 would create a cycle.
     """
-    def dfs(current, target, visited):
-        if current == target:
-            return True  # Cycle detected
-        if current in visited:
-            return False
-        visited.add(current)
-        parents = get_all_parents(current)
-        for parent in parents:
-            if dfs(parent, target, visited):
-                return True
+    name1, name2 = name1.lower(), name2.lower()
+    if name1 == name2:
+        return True
+    person1 = family_index.people.lookup(name1)
+    person2 = family_index.people.lookup(name2)
+    if person1 is None or person2 is None:
         return False
+    # A cycle appears if name2 is already one of name1's ancestors
+    return family_index.is_ancestor(person2, person1)
 
-    # Check if there is a path from name2 to name1
-    return dfs(name2.lower(), name1.lower(), set())
+def kinship_term(up1, up2, gender=None):
+    """Name the relation of X to Y from kinship()'s generation counts.
+
+    up1 and up2 are the generations from X and from Y up to their nearest
+    common ancestor; gender is X's, if known.
+    """
+    def word(kind, prefix=""):
+        words = KINSHIP_WORDS[kind]
+        if gender:
+            return prefix + words[1 if gender == "male" else 2]
+        return " or ".join(prefix + part for part in words[0].split(" or "))
+
+    if up1 == 0:
+        return word("parent", "great-" * (up2 - 2) + "grand" * (up2 > 1))
+    if up2 == 0:
+        return word("child", "great-" * (up1 - 2) + "grand" * (up1 > 1))
+    if up1 == up2 == 1:
+        return word("sibling")
+    if up1 == 1:
+        return word("aunt_or_uncle", "great-" * (up2 - 2))
+    if up2 == 1:
+        return word("niece_or_nephew", "great-" * (up1 - 2))
+    degree = min(up1, up2) - 1
+    term = f"{ORDINALS[degree - 1] if degree <= len(ORDINALS) else f'{degree}th'} cousin"
+    removed = abs(up1 - up2)
+    if removed:
+        term += " " + {1: "once", 2: "twice"}.get(removed, f"{removed} times") + " removed"
+    return term
+
+def kinship(name1, name2):
+    """Describe how name1 is related to name2, or None if they are not.
+
+    A person is not their own relative, so the same name gives None.
+    """
+    person1 = family_index.people.lookup(name1.lower())
+    person2 = family_index.people.lookup(name2.lower())
+    if person1 is None or person2 is None or person1 == person2:
+        return None
+    levels = family_index.kinship(person1, person2)
+    return None if levels is None else kinship_term(*levels, family_index.gender(person1))
+
+def rebuild_index():
+    """Reseed the Python-side index from the backend's facts."""
+    facts = backend.facts(INDEXED_FACTS)
+    family_index.clear()
+    for predicate, names in facts:
+        family_index.add_fact(predicate, *names)
+
+def use_backend(name):
+    """Select the backend by name (see BACKENDS), before any fact is learned.
+
+    "prolog" evaluates relationship.pl on SWI-Prolog; only questions
+    about the views FamilyIndex materializes (grandparent, aunt_or_uncle,
+    cousin and their gendered forms) are read from the index. "graph"
+    answers everything in Python from family_index and never starts
+    SWI-Prolog. "differential" answers with Prolog and checks every
+    answer against the graph backend. See the backends' index_relations.
+    """
+    global backend
+    prolog_backend = PrologBackend(prolog, RULES_FILE, prolog_lock)
+    if name == "prolog":
+        backend = prolog_backend
+    elif name == "graph":
+        backend = GraphBackend(family_index)
+    elif name == "differential":
+        backend = DifferentialBackend(prolog_backend, GraphBackend(family_index))
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+    query_cache.invalidate()
 
 def get_gender(name):
-    """Determine the gender of a person based on Prolog facts."""
-    if is_existing_relation("male", name):
-        return "male"
-    if is_existing_relation("female", name):
-        return "female"
-    return None
+    """Determine the gender of a person based on the mirrored Prolog facts."""
+    person = family_index.people.lookup(name.lower())
+    return None if person is None else family_index.gender(person)
+
+def compact_snapshot():
+    """Return a read-only CompactFamilyStore copy of the index.
+
+    Its get_all_parents() and get_gender() answer like the functions
+    above, in a fraction of the index's memory.
+    """
+    return CompactFamilyStore.from_index(family_index)
 
 def check_gender(name, gender):
     """Validate if the specified gender matches the person's gender."""
@@ -90,299 +407,351 @@ def assert_relationship(relation, name1, name2, gender=None):
         if detect_cycle(name1, name2):
             raise ValueError(f"That's impossible! Adding {relation} between {name1} and {name2} would create a circular ancestry.")
 
-    # Check if the relationship already exists
-    if is_existing_relation(relation, name1, name2):
-        raise ValueError(f"{name1.capitalize()} is already the {relation} of {name2.capitalize()}.")
+    # Check if the relationship already exists. Inside a batch the index
+    # already holds the queued facts, so it answers without a flush.
+    if fact_batch.open and relation in GRAPH_RELATIONS:
+        exists = index_rules.exists(relation, name1, name2)
+    else:
+        exists = is_existing_relation(relation, name1, name2)
+    if exists:
+        raise DuplicateRelation(f"{name1.capitalize()} is already the {relation} of {name2.capitalize()}.")
 
     # Check gender consistency
     if gender:
         if not check_gender(name1, gender):
             raise ValueError(f"That's impossible! {name1.capitalize()} is not {gender}.")
 
-    # Add the relationship
+    # Add the relationship (detect_cycle already did safe_add_parent's check)
     if relation in ["father", "mother", "parent"]:
-        result = execute_query(f"safe_add_parent({name1}, {name2})")
-        if not result:
-            raise ValueError(f"That's impossible! Adding {relation} between {name1} and {name2} would create a cycle.")
+        add_fact("parent", name1, name2)
     elif relation in ["siblings", "sister", "brother"]:
         # Use siblings_direct to prevent recursion issues
-        prolog.assertz(f"siblings_direct({name1.lower()}, {name2.lower()})")
+        add_fact("siblings_direct", name1, name2)
     else:
-        prolog.assertz(f"{relation}({name1}, {name2})")
+        add_fact(relation, name1, name2)
 
     # Add gender if applicable
     if gender:
-        prolog.assertz(f"{gender}({name1})")
-
-    print("OK! I learned something.")
+        add_fact(gender, name1)
 
 def reload_prolog():
     """Reload the Prolog knowledge base."""
     try:
-        prolog.consult("relationship.pl")
+        backend.reload()
+        query_cache.invalidate()
+        rebuild_index()
         print("Prolog knowledge base reloaded.")
     except Exception as e:
         print(f"Failed to reload Prolog file: {e}")
 
+def open_journal(directory):
+    """Load the knowledge base saved in directory and keep journaling there."""
+    global journal
+    journal = FactJournal(directory)
+    backend.load_journal(journal)
+    query_cache.invalidate()
+    rebuild_index()
+
+
+# Sentence templates, tried in order. "{}" stands for a capitalized name.
+# Each entry is (template, relation, action); templates ending in "." are
+# assertions and templates ending in "?" are queries.
+SENTENCE_TEMPLATES = [
+    ("{} and {} are siblings.", "siblings", "assert_symmetric"),
+    ("{} is a sister of {}.", "sister", "assert"),
+    ("{} is a brother of {}.", "brother", "assert"),
+    ("{} is the mother of {}.", "mother", "assert"),
+    ("{} is the father of {}.", "father", "assert"),
+    ("{} is a grandmother of {}.", "grandmother", "assert"),
+    ("{} is a grandfather of {}.", "grandfather", "assert"),
+    ("{} is a child of {}.", "child", "assert"),
+    ("{} is a daughter of {}.", "daughter", "assert"),
+    ("{} is a son of {}.", "son", "assert"),
+    ("{} is an uncle of {}.", "uncle", "assert"),
+    ("{} is an aunt of {}.", "aunt", "assert"),
+    ("Are {} and {} the parents of {}.", "parent", "assert_parents"),
+    ("Are {}, {}, and {} are children of {}.", "parent", "assert_children"),
+    ("Are {} and {} siblings?", "siblings", "ask"),
+    ("Is {} a sister of {}?", "sister", "ask"),
+    ("Is {} a brother of {}?", "brother", "ask"),
+    ("Is {} the mother of {}?", "mother", "ask"),
+    ("Is {} the father of {}?", "father", "ask"),
+    ("Are {} and {} the parents of {}?", "parent", "ask_parents"),
+    ("Is {} a grandmother of {}?", "grandmother", "ask"),
+    ("Is {} a daughter of {}?", "daughter", "ask"),
+    ("Is {} a son of {}?", "son", "ask"),
+    ("Is {} a child of {}?", "child", "ask"),
+    ("Are {}, {}, and {} children of {}?", "parent", "ask_children"),
+    ("Is {} an uncle of {}?", "uncle", "ask"),
+    ("Is {} a grandfather of {}?", "grandfather", "ask"),
+    ("Is {} an aunt of {}?", "aunt", "ask"),
+    ("Are {} and {} relatives?", "relative", "ask"),
+    ("Are {} and {} cousins?", "cousin", "ask"),
+    ("How is {} related to {}?", "kinship", "ask_kinship"),
+]
+
+# "Who is the <relation> of X?" and "Who are the <relations> of X?"
+SENTENCE_TEMPLATES += [
+    (f"Who {verb} the {label} of {{}}?", relation, "who")
+    for relation, labels in WHO_LABELS.items()
+    for verb, label in zip(("is", "are"), labels)
+]
+
+NAME_PATTERN = r"([A-Z][a-z]*)"
+
+
+def compile_templates(templates):
+    """Build one combined matcher for all templates.
+
+    Every template becomes a named alternative ``t<index>`` of a single
+    regex, so a sentence is classified in one pass. Returns the compiled
+    pattern and, per template, the group number of its first name.
+    """
+    alternatives = []
+    first_groups = []
+    group = 0
+    for index, (template, _, _) in enumerate(templates):
+        parts = template.split("{}")
+        group += 1  # the template's own group
+        first_groups.append(group + 1)
+        group += len(parts) - 1
+        body = NAME_PATTERN.join(re.escape(part) for part in parts)
+        alternatives.append(f"(?P<t{index}>{body})")
+    return re.compile("|".join(alternatives)), first_groups
 
-def process_assertion(sentence):
-    """Process assertion sentences dynamically."""
-    try:
-        
-        # Pattern: "<Name1> and <Name2> are siblings."
-        match = re.match(r"([A-Z][a-z]*) and ([A-Z][a-z]*) are siblings\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("siblings", name1, name2)
-            assert_relationship("siblings", name2, name1)
-            return True
-
-        # Pattern: "<Name1> is a sister of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a sister of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("sister", name1, name2, "female")
-            return True
-
-        # Pattern: "<Name1> is a brother of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a brother of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("brother", name1, name2, "male")
-            return True
-
-        # Pattern: "<Name1> is the mother of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is the mother of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("mother", name1, name2, "female")
-            return True
-
-        # Pattern: "<Name1> is the father of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is the father of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("father", name1, name2, "male")
-            return True
-        
-        # Pattern: "<Name1> is a grandmother of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a grandmother of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("grandmother", name1, name2)
-            return True
-        
-        # Pattern: "<Name1> is a grandfather of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a grandfather of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("grandfather", name1, name2)
-            return True
-        
-        # Pattern: "<Name1> is a child of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a child of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("child", name1, name2)
-            return True
-
-        # Pattern: "<Name1> is a daughter of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a daughter of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("daughter", name1, name2, "female")
-            return True
-
-        # Pattern: "<Name1> is a son of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is a son of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("son", name1, name2, "male")
-            return True
-
-        # Pattern: "<Name1> is an uncle of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is an uncle of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("uncle", name1, name2, "male")
-            return True
-
-        # Pattern: "<Name1> is an aunt of <Name2>."
-        match = re.match(r"([A-Z][a-z]*) is an aunt of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2 = match.groups()
-            assert_relationship("aunt", name1, name2, "female")
-            return True
-
-        # Pattern: "<Name1> and <Name2> are the parents of <Name3>."
-        match = re.match(r"Are ([A-Z][a-z]*) and ([A-Z][a-z]*) the parents of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            name1, name2, child = match.groups()
-            assert_relationship("parent", name1, child)
-            assert_relationship("parent", name2, child)
-            return True
-
-        # Pattern: "<Name1>, <Name2>, and <Name3> are children of <Name4>."
-        match = re.match(r"Are ([A-Z][a-z]*), ([A-Z][a-z]*), and ([A-Z][a-z]*) are children of ([A-Z][a-z]*)\.", sentence)
-        if match:
-            child1, child2, child3, parent = match.groups()
-            assert_relationship("parent", parent, child1)
-            assert_relationship("parent", parent, child2)
-            assert_relationship("parent", parent, child3)
-            return True
 
-    except ValueError as e:
-        print(e)
-        return True 
+SENTENCE_MATCHER, TEMPLATE_GROUPS = compile_templates(SENTENCE_TEMPLATES)
 
-    return False
 
+def parse_sentence(sentence):
+    """Classify a sentence; return (template, relation, action, names) or None."""
+    with profiler.span("parse", "sentence"):
+        match = SENTENCE_MATCHER.match(sentence)
+    if not match:
+        return None
+    index = int(match.lastgroup[1:])
+    template, relation, action = SENTENCE_TEMPLATES[index]
+    first = TEMPLATE_GROUPS[index]
+    names = tuple(match.group(group) for group in range(first, first + template.count("{}")))
+    return template, relation, action, names
 
-def process_query(sentence):
-    """Handle query sentences."""
-    # Pattern: "Are <Name1> and <Name2> siblings?"
-    match = re.match(r"Are ([A-Z][a-z]*) and ([A-Z][a-z]*) siblings\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("siblings", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Is <Name1> a sister of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a sister of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("sister", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
+def assert_pair(relation, name1, name2):
+    """'<Name1> is a <relation> of <Name2>.'"""
+    assert_relationship(relation, name1, name2, RELATIONSHIPS[relation].get("gender"))
 
-    # Pattern: "Is <Name1> a brother of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a brother of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("brother", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Is <Name1> the mother of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) the mother of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("mother", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
+def assert_symmetric(relation, name1, name2):
+    """'<Name1> and <Name2> are <relation>.'"""
+    # One fact is enough: sibling_link/2 reads it in both directions
+    assert_relationship(relation, name1, name2)
 
-    # Pattern: "Is <Name1> the father of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) the father of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("father", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Are <Name1> and <Name2> the parents of <Name3>?"
-    match = re.match(r"Are ([A-Z][a-z]*) and ([A-Z][a-z]*) the parents of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        parent1, parent2, child = match.groups()
-        exists1 = is_existing_relation("parent", parent1, child)
-        exists2 = is_existing_relation("parent", parent2, child)
-        print("Yes!" if exists1 and exists2 else "No!")
-        return True
-    
-    # Pattern: "Is <Name1> a grandmother of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a grandmother of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("grandmother", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
+def assert_parents(relation, parent1, parent2, child):
+    """'<Name1> and <Name2> are the parents of <Name3>.'"""
+    assert_relationship(relation, parent1, child)
+    assert_relationship(relation, parent2, child)
 
-    # Pattern: "Is <Name1> a daughter of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a daughter of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("daughter", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Is <Name1> a son of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a son of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("son", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
+def assert_children(relation, *names):
+    """'<Name1>, <Name2>, and <Name3> are children of <Name4>.'"""
+    *children, parent = names
+    for child in children:
+        assert_relationship(relation, parent, child)
 
-    # Pattern: "Is <Name1> a child of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a child of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("child", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Are <Name1>, <Name2>, and <Name3> children of <Name4>?"
-    match = re.match(r"Are ([A-Z][a-z]*), ([A-Z][a-z]*), and ([A-Z][a-z]*) children of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        child1, child2, child3, parent = match.groups()
-        exists1 = is_existing_relation("parent", parent, child1)
-        exists2 = is_existing_relation("parent", parent, child2)
-        exists3 = is_existing_relation("parent", parent, child3)
-        print("Yes!" if exists1 and exists2 and exists3 else "No!")
-        return True
+def ask_pair(relation, name1, name2):
+    """'Is <Name1> a <relation> of <Name2>?'"""
+    return is_existing_relation(relation, name1, name2)
 
-    # Pattern: "Is <Name1> an uncle of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) an uncle of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("uncle", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
-    
-    #whowhowhowho
-
-    # Pattern: "Is <Name1> a grandfather of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) a grandfather of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("grandfather", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
-    
-    #whowhowho
-
-    # Pattern: "Is <Name1> an aunt of <Name2>?"
-    match = re.match(r"Is ([A-Z][a-z]*) an aunt of ([A-Z][a-z]*)\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("aunt", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
 
-    # Pattern: "Are <Name1> and <Name2> relatives?"
-    match = re.match(r"Are ([A-Z][a-z]*) and ([A-Z][a-z]*) relatives\?", sentence)
-    if match:
-        name1, name2 = match.groups()
-        exists = is_existing_relation("relative", name1, name2)
-        print("Yes!" if exists else "No!")
-        return True
-    
-    # If no pattern matched
-    return False
+def ask_parents(relation, parent1, parent2, child):
+    """'Are <Name1> and <Name2> the parents of <Name3>?'"""
+    return (is_existing_relation(relation, parent1, child)
+            and is_existing_relation(relation, parent2, child))
+
+
+def ask_children(relation, *names):
+    """'Are <Name1>, <Name2>, and <Name3> children of <Name4>?'"""
+    *children, parent = names
+    return all(is_existing_relation(relation, parent, child) for child in children)
+
+
+def ask_who(relation, name):
+    """'Who is the <relation> of <Name>?'"""
+    return tuple(who(relation, name))
+
+
+def ask_kinship(relation, name1, name2):
+    """'How is <Name1> related to <Name2>?'"""
+    if name1 == name2:
+        raise ValueError("That's impossible! A person cannot be their own relative.")
+    return kinship(name1, name2)
+
+
+ACTIONS = {
+    "assert": assert_pair,
+    "assert_symmetric": assert_symmetric,
+    "assert_parents": assert_parents,
+    "assert_children": assert_children,
+    "ask": ask_pair,
+    "ask_parents": ask_parents,
+    "ask_children": ask_children,
+    "ask_kinship": ask_kinship,
+    "who": ask_who,
+}
+
+
+def run_action(template, relation, action, names):
+    """Run the action of a parsed sentence and return its Result.
+
+    Aborted queries (see prolog_terms.limits) propagate to the caller.
+    """
+    try:
+        answer = ACTIONS[action](relation, *names)
+    except DuplicateRelation as e:
+        return Result(REJECTED, relation, names, error=DUPLICATE, message=str(e))
+    except ValueError as e:
+        return Result(REJECTED, relation, names, error=IMPOSSIBLE, message=str(e))
+    except QueryAborted:
+        raise
+    except Exception as e:
+        return Result(FAILED, relation, names, error=PROLOG, message=f"Error: {e}")
+    if action == "who":
+        # Label the answer in the number it has, or as asked if empty
+        singular, plural = WHO_LABELS[relation]
+        label = template.split()[3] if not answer else singular if len(answer) == 1 else plural
+        return Result(ANSWERED, label, names, answer=answer)
+    if template.endswith("?"):
+        return Result(ANSWERED, relation, names, answer=answer)
+    return Result(LEARNED, relation, names)
+
+
+def run_parsed(parsed):
+    """Run the action for a parsed sentence and return its Result."""
+    with profiler.span("sentence", parsed[0]):
+        return run_action(*parsed)
+
+
+def process_assertion(sentence):
+    """Process assertion sentences dynamically; False if not understood."""
+    parsed = parse_sentence(sentence)
+    if parsed is None or not parsed[0].endswith("."):
+        return False
+    return run_parsed(parsed)
+
+
+def process_query(sentence):
+    """Handle query sentences; False if not understood."""
+    parsed = parse_sentence(sentence)
+    if parsed is None or not parsed[0].endswith("?"):
+        return False
+    return run_parsed(parsed)
 
 
 def process_sentence(sentence):
-    """Process both assertions and queries."""
-    if process_assertion(sentence):
-        return True
-    if process_query(sentence):
-        return True
-    return False
+    """Process both assertions and queries; False if not understood."""
+    parsed = parse_sentence(sentence)
+    if parsed is None:
+        return False
+    return run_parsed(parsed)
+
+
+def read_sentences(stream):
+    """Lazily yield the non-empty lines of a stream."""
+    for line in stream:
+        sentence = line.strip()
+        if sentence:
+            yield sentence
+
+
+def process_batch(sentences, chunk_size=BATCH_SIZE, on_answer=print):
+    """Process many sentences, committing facts in chunks.
+
+    Queries are still answered as they come and their Results passed to
+    on_answer. Returns counts of learned, duplicate, impossible and
+    invalid assertions, answered questions, and failed sentences of
+    either kind (e.g. a Prolog error).
+    """
+    counts = dict.fromkeys(["learned", "duplicate", "impossible", "invalid", "answered", "failed"], 0)
+    fact_batch.open = True
+    try:
+        for sentence in sentences:
+            parsed = parse_sentence(sentence)
+            if parsed is None:
+                counts["invalid"] += 1
+                continue
+            if parsed[0].endswith("?"):
+                fact_batch.flush()
+                result = run_parsed(parsed)
+                on_answer(result)
+                counts["failed" if result.status == FAILED else "answered"] += 1
+                continue
+            result = run_parsed(parsed)
+            if result.status == LEARNED:
+                counts["learned"] += 1
+            elif result.status == FAILED:
+                counts["failed"] += 1
+            elif result.error == DUPLICATE:
+                counts["duplicate"] += 1
+            else:
+                counts["impossible"] += 1
+            if len(fact_batch.facts) >= chunk_size:
+                fact_batch.flush()
+    finally:
+        fact_batch.flush()
+        fact_batch.open = False
+    return counts
+
+
+def print_summary(counts):
+    """Print the report of a batch run."""
+    for key, count in counts.items():
+        print(f"{key.capitalize()}: {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Learn and answer family relationship sentences.")
+    parser.add_argument("--batch", metavar="FILE", help="read sentences from FILE ('-' for stdin) and print a summary")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_SIZE, help="facts committed per Prolog call in batch mode")
+    parser.add_argument("--backend", choices=BACKENDS, default="prolog",
+                        help="engine answering questions; 'differential' checks the graph engine against Prolog")
+    parser.add_argument("--data", metavar="DIR", help="load learned facts from DIR and save new ones there")
+    parser.add_argument("--profile", metavar="FILE", help="record per-predicate and per-sentence timings to FILE as JSON")
+    parser.add_argument("--flamegraph", metavar="FILE", help="record folded call stacks to FILE for flamegraph tools")
+    args = parser.parse_args(argv)
+
+    use_backend(args.backend)
+    if args.profile or args.flamegraph:
+        profiler.enable(prolog if backend.uses_prolog else None)
+
+    if args.data:
+        open_journal(args.data)
+    try:
+        if args.batch:
+            if args.batch == "-":
+                counts = process_batch(read_sentences(sys.stdin), args.chunk_size)
+            else:
+                with open(args.batch, encoding="utf-8") as stream:
+                    counts = process_batch(read_sentences(stream), args.chunk_size)
+            print_summary(counts)
+            return
+
+        print("Enter a prompt below.")
+        while (sentence := input("\n> ").strip()) != "quit":
+            result = process_sentence(sentence)
+            print(result if result else "Invalid input given.")
+    finally:
+        if journal:
+            journal.close()
+        if args.profile:
+            profiler.save_json(args.profile)
+        if args.flamegraph:
+            profiler.save_folded(args.flamegraph)
+        if isinstance(backend, DifferentialBackend):
+            print(backend.summary())
+
 
 if __name__ == "__main__":
-    reload_prolog()
-    print("Enter a prompt below.")
-    while (sentence := input("\n> ").strip()) != "quit":
-        if not process_sentence(sentence):
-            print("Invalid input given.")
+    main()
 
@@ -1,8 +1,17 @@
+import argparse
+import os
 import re
-from pyswip import Prolog
+from journal import FactJournal, parse_fact
+from kb_loader import LazyProlog
+from prolog_terms import QueryAborted, assert_facts, relation_set, retract_fact, template
+from results import ANSWERED, DUPLICATE, FAILED, IMPOSSIBLE, LEARNED, PROLOG, REJECTED, Result
 
-prolog = Prolog()
-prolog.consult("family_kb.pl")
+# SWI-Prolog starts and loads the rules on the first query. The path
+# is taken from this file, so MAIN/maintest.py can load it from MAIN/.
+prolog = LazyProlog(os.path.join(os.path.dirname(os.path.abspath(__file__)), "family_kb.pl"))
+
+# Append-only log of learned facts, set up by open_journal()
+journal = None
 
 relationships = ["sister", 
                  "brother", 
@@ -21,8 +30,11 @@ relationships = ["sister",
                  "grandchild",
                  "aunt_or_uncle"]
 
+# One bit per relationship, used to mask the result of relations_between
+relationship_bits = {relationship: 1 << i for i, relationship in enumerate(relationships)}
+
 
-def handle_sibling_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, print_function):
+def handle_sibling_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, find_function):
     # Handle statements (ends with a period)
     if "." in sentence:
         if len(names) == 2:
@@ -33,24 +45,23 @@ def handle_sibling_relationship(sentence, names, relationship, gender, excluded,
                 if is_valid_gender(sibling1, gender) or is_valid_gender(sibling1, "genderless") or not person_exists(sibling1, "person"):
                     if not is_existing_relation(relationship, sibling1, sibling2):
                         # Assert sibling relationship in Prolog
-                        prolog.assertz(f"{relationship}({sibling1}, {sibling2})")
+                        assert_fact(f"{relationship}({sibling1}, {sibling2})")
 
                         # Update gender if genderless
                         if is_valid_gender(sibling1, "genderless"):
                             update_gender(names[0], gender)
                         else:
-                            prolog.assertz(f"{gender}({sibling1})")
+                            assert_fact(f"{gender}({sibling1})")
 
                         # Mark as a person
-                        prolog.assertz(f"person({sibling1})")
-                        print("OK! I learned something.")
+                        assert_fact(f"person({sibling1})")
+                        return Result(LEARNED, relationship)
                     else:
-                        print(f"{names[0]} is already the {relationship} of {names[1]}.")
+                        return Result(REJECTED, relationship, error=DUPLICATE, message=f"{names[0]} is already the {relationship} of {names[1]}.")
                 else:
-                    print("That's impossible!")
+                    return Result(REJECTED, relationship, error=IMPOSSIBLE)
             else:
-                print("That's impossible!")
-            return True
+                return Result(REJECTED, relationship, error=IMPOSSIBLE)
         else:
             return False
 
@@ -60,24 +71,22 @@ def handle_sibling_relationship(sentence, names, relationship, gender, excluded,
         if "Who" in sentence:
             sibling_name_match = re.search(rf'{relationship}s of (\w+)', sentence, re.IGNORECASE)
             if sibling_name_match:
-                print_function(sibling_name_match.group(1))
-                return True
+                return find_function(sibling_name_match.group(1))
             else:
                 return False
 
         if len(names) == 2:
             sibling1, sibling2 = names[0].lower(), names[1].lower()
             if is_valid_gender(sibling1, "genderless") and is_existing_relation("siblings", sibling1, sibling2):
-                print("Not enough information to determine sibling's gender.")
+                return Result(ANSWERED, relationship, message="Not enough information to determine sibling's gender.")
             elif is_existing_relation(relationship, sibling1, sibling2):
-                print("Yes!")
+                return Result(ANSWERED, relationship, answer=True)
             else:
-                print("No!")
-            return True
+                return Result(ANSWERED, relationship, answer=False)
         else:
             return False
 
-def handle_parent_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, print_function):
+def handle_parent_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, find_function):
     # Handle statements (ends with a period)
     if "." in sentence:
         if len(names) == 2:
@@ -93,19 +102,18 @@ def handle_parent_relationship(sentence, names, relationship, gender, excluded,
                                 update_gender(names[0], gender)
 
                             # Assert parent relationship in Prolog
-                            prolog.assertz(f"{relationship}({parent}, {child})")
-                            prolog.assertz(f"{gender}({parent})")
-                            prolog.assertz(f"person({parent})")
-                            print("OK! I learned something.")
+                            assert_fact(f"{relationship}({parent}, {child})")
+                            assert_fact(f"{gender}({parent})")
+                            assert_fact(f"person({parent})")
+                            return Result(LEARNED, relationship)
                         else:
-                            print("That's impossible!")
+                            return Result(REJECTED, relationship, error=IMPOSSIBLE)
                     else:
-                        print(f"{names[0]} is already the {relationship} of {names[1]}.")
+                        return Result(REJECTED, relationship, error=DUPLICATE, message=f"{names[0]} is already the {relationship} of {names[1]}.")
                 else:
-                    print("That's impossible!")
+                    return Result(REJECTED, relationship, error=IMPOSSIBLE)
             else:
-                print("That's impossible!")
-            return True
+                return Result(REJECTED, relationship, error=IMPOSSIBLE)
         else:
             return False
 
@@ -115,24 +123,22 @@ def handle_parent_relationship(sentence, names, relationship, gender, excluded,
         if "Who" in sentence:
             parent_name_match = re.search(fr'{relationship} of (\w+)', sentence, re.IGNORECASE)
             if parent_name_match:
-                print_function(parent_name_match.group(1))
-                return True
+                return find_function(parent_name_match.group(1))
             else:
                 return False
 
         if len(names) == 2:
             parent, child = names[0].lower(), names[1].lower()
             if is_valid_gender(parent, "genderless") and is_existing_relation("parent", parent, child):
-                print("Not enough information to determine parent's gender.")
+                return Result(ANSWERED, relationship, message="Not enough information to determine parent's gender.")
             elif is_existing_relation(relationship, parent, child):
-                print("Yes!")
+                return Result(ANSWERED, relationship, answer=True)
             else:
-                print("No!")
-            return True
+                return Result(ANSWERED, relationship, answer=False)
         else:
             return False
         
-def handle_child_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, print_function):
+def handle_child_relationship(sentence, names, relationship, gender, excluded, inverse_excluded, find_function):
     # Handle statements (ends with a period)
     if "." in sentence:
         if len(names) == 2:
@@ -149,20 +155,19 @@ def handle_child_relationship(sentence, names, relationship, gender, excluded, i
                             unique_relationship("parent", child) < 2)
                         ):
                             # Assert child relationship in Prolog
-                            prolog.assertz(f"{relationship}({child}, {parent})")
-                            prolog.assertz(f"{gender}({child})")
-                            prolog.assertz(f"parent({parent}, {child})")
-                            prolog.assertz(f"person({child})")
-                            print("OK! I learned something.")
+                            assert_fact(f"{relationship}({child}, {parent})")
+                            assert_fact(f"{gender}({child})")
+                            assert_fact(f"parent({parent}, {child})")
+                            assert_fact(f"person({child})")
+                            return Result(LEARNED, relationship)
                         else:
-                            print("That's impossible!")
+                            return Result(REJECTED, relationship, error=IMPOSSIBLE)
                     else:
-                        print(f"{names[0]} is already a {relationship} of {names[1]}.")
+                        return Result(REJECTED, relationship, error=DUPLICATE, message=f"{names[0]} is already a {relationship} of {names[1]}.")
                 else:
-                    print("That's impossible!")
+                    return Result(REJECTED, relationship, error=IMPOSSIBLE)
             else:
-                print("That's impossible!")
-            return True
+                return Result(REJECTED, relationship, error=IMPOSSIBLE)
         else:
             return False
 
@@ -170,8 +175,7 @@ def handle_child_relationship(sentence, names, relationship, gender, excluded, i
     elif f"{relationship}s of" in sentence and "?" in sentence:
         parent_name_match = re.search(fr'{relationship}s of (\w+)', sentence, re.IGNORECASE)
         if parent_name_match:
-            print_function(parent_name_match.group(1))
-            return True
+            return find_function(parent_name_match.group(1))
         else:
             return False
 
@@ -181,12 +185,11 @@ def handle_child_relationship(sentence, names, relationship, gender, excluded, i
         if len(names) == 2:
             child, parent = names[0].lower(), names[1].lower()
             if is_valid_gender(child, "genderless") and is_existing_relation("parent", parent, child):
-                print("Not enough information to determine child's gender.")
+                return Result(ANSWERED, relationship, message="Not enough information to determine child's gender.")
             elif is_existing_relation(relationship, child, parent):
-                print("Yes!")
+                return Result(ANSWERED, relationship, answer=True)
             else:
-                print("No!")
-            return True
+                return Result(ANSWERED, relationship, answer=False)
         else:
             return False
 
@@ -204,19 +207,18 @@ def handle_grandparent_relationship(sentence, names, relationship, gender):
                     if not is_existing_relation(relationship, grandparent, grandchild):
                         if unique_relationship(relationship, names[1]) < 2:
                             # Assert grandparent relationship in Prolog
-                            prolog.assertz(f"{relationship}({grandparent}, {grandchild})")
-                            prolog.assertz(f"{gender}({grandparent})")
-                            prolog.assertz(f"person({grandparent})")
-                            print("OK! I learned something.")
+                            assert_fact(f"{relationship}({grandparent}, {grandchild})")
+                            assert_fact(f"{gender}({grandparent})")
+                            assert_fact(f"person({grandparent})")
+                            return Result(LEARNED, relationship)
                         else:
-                            print("That's impossible!")
+                            return Result(REJECTED, relationship, error=IMPOSSIBLE)
                     else:
-                        print(f"{names[0]} is already a {relationship} of {names[1]}.")
+                        return Result(REJECTED, relationship, error=DUPLICATE, message=f"{names[0]} is already a {relationship} of {names[1]}.")
                 else:
-                    print("That's impossible!")
+                    return Result(REJECTED, relationship, error=IMPOSSIBLE)
             else:
-                print("That's impossible!")
-            return True
+                return Result(REJECTED, relationship, error=IMPOSSIBLE)
         else:
             return False
 
@@ -225,10 +227,9 @@ def handle_grandparent_relationship(sentence, names, relationship, gender):
         if len(names) == 2:
             grandparent, grandchild = names[0].lower(), names[1].lower()
             if is_existing_relation(relationship, grandparent, grandchild):
-                print("Yes!")
+                return Result(ANSWERED, relationship, answer=True)
             else:
-                print("No!")
-            return True
+                return Result(ANSWERED, relationship, answer=False)
         else:
             return False
         
@@ -243,18 +244,17 @@ def handle_aunt_uncle_relationship(sentence, names, relationship, gender, exclud
                 if is_valid_gender(relative, gender) or is_valid_gender(relative, "genderless") or not person_exists(relative, "person"):
                     if unique_relationship(relationship, names[1]) < 2 and not is_existing_relation(relationship, relative, niece_nephew):
                         # Assert aunt/uncle relationship in Prolog
-                        prolog.assertz(f"{relationship}({relative}, {niece_nephew})")
+                        assert_fact(f"{relationship}({relative}, {niece_nephew})")
                         if gender != "genderless":
-                            prolog.assertz(f"{gender}({relative})")
-                        prolog.assertz(f"person({relative})")
-                        print("OK! I learned something.")
+                            assert_fact(f"{gender}({relative})")
+                        assert_fact(f"person({relative})")
+                        return Result(LEARNED, relationship)
                     else:
-                        print(f"{names[0]} is already their {relationship}.")
+                        return Result(REJECTED, relationship, error=DUPLICATE, message=f"{names[0]} is already their {relationship}.")
                 else:
-                    print("That's impossible!")
+                    return Result(REJECTED, relationship, error=IMPOSSIBLE)
             else:
-                print("That's impossible!")
-            return True
+                return Result(REJECTED, relationship, error=IMPOSSIBLE)
         else:
             return False
 
@@ -264,16 +264,25 @@ def handle_aunt_uncle_relationship(sentence, names, relationship, gender, exclud
         if len(names) == 2:
             relative, niece_nephew = names[0].lower(), names[1].lower()
             if is_existing_relation(relationship, relative, niece_nephew):
-                print("Yes!")
+                return Result(ANSWERED, relationship, answer=True)
             else:
-                print("No!")
-            return True
+                return Result(ANSWERED, relationship, answer=False)
         else:
             return False
 
         
-# Sentence process for assertion and query
+# Sentence process for assertion and query; returns a Result, or a
+# false value if the sentence is not understood. Goals stopped by
+# prolog_terms.limits() raise QueryAborted to the caller.
 def process(sentence):
+    try:
+        return handle_sentence(sentence)
+    except QueryAborted:
+        raise
+    except Exception as e:
+        return Result(FAILED, error=PROLOG, message=f"Error: {e}")
+
+def handle_sentence(sentence):
     # Extract sentence
     names = re.findall(r'\b[A-Z][a-z]*\b', sentence)
 
@@ -289,21 +298,20 @@ def process(sentence):
                 if person1 != person2 and are_related(excluded, inverse_excluded, names[0], names[1]):
                     if not is_existing_relation("siblings", names[0], names[1]):
                         # Assert sibling relationship in Prolog
-                        prolog.assertz(f"siblings({person1}, {person2})")
-                        prolog.assertz(f"siblings({person2}, {person1})")
+                        assert_fact(f"siblings({person1}, {person2})")
+                        assert_fact(f"siblings({person2}, {person1})")
 
                         # Add genderless facts if genders are undefined
                         if not (is_valid_gender(person1, "male") or is_valid_gender(person1, "female")):
-                            prolog.assertz(f"genderless({person1})")
+                            assert_fact(f"genderless({person1})")
                         if not (is_valid_gender(person2, "male") or is_valid_gender(person2, "female")):
-                            prolog.assertz(f"genderless({person2})")
+                            assert_fact(f"genderless({person2})")
 
-                        print("OK! I learned something.")
+                        return Result(LEARNED, "siblings")
                     else:
-                        print(f"{names[0]} and {names[1]} are already siblings.")
+                        return Result(REJECTED, "siblings", error=DUPLICATE, message=f"{names[0]} and {names[1]} are already siblings.")
                 else:
-                    print("That's impossible!")
-                return True
+                    return Result(REJECTED, "siblings", error=IMPOSSIBLE)
             else:
                 return False
 
@@ -313,18 +321,16 @@ def process(sentence):
             if "Who" in sentence:
                 sibling_name_match = re.search(r'siblings of (\w+)', sentence, re.IGNORECASE)
                 if sibling_name_match:
-                    print_siblings(sibling_name_match.group(1))
-                    return True
+                    return find_siblings(sibling_name_match.group(1))
                 else:
                     return False
 
             if len(names) == 2:
                 person1, person2 = names[0].lower(), names[1].lower()
                 if is_existing_relation("siblings", person1, person2):
-                    print("Yes!")
+                    return Result(ANSWERED, "siblings", answer=True)
                 else:
-                    print("No!")
-                return True
+                    return Result(ANSWERED, "siblings", answer=False)
             else:
                 return False
 
@@ -336,7 +342,7 @@ def process(sentence):
             "sister", "female", 
             ["siblings", "sister"], 
             ["siblings", "brother", "sister"], 
-            print_sisters
+            find_sisters
         )
 
     # Check for "brother" relationship
@@ -346,7 +352,7 @@ def process(sentence):
             "brother", "male", 
             ["siblings", "brother"], 
             ["siblings", "brother", "sister"], 
-            print_brothers
+            find_brothers
         )
 
     # Check for "grandmother" relationship
@@ -366,7 +372,7 @@ def process(sentence):
             "female", 
             ["parent", "mother"], 
             ["child", "daughter", "son"], 
-            print_mother
+            find_mother
         )
 
     # Check for "father" relationships
@@ -378,7 +384,7 @@ def process(sentence):
             "male", 
             ["parent", "father"], 
             ["child", "daughter", "son"], 
-            print_father
+            find_father
         )
     
     # Check for parents relationship
@@ -395,23 +401,22 @@ def process(sentence):
                     if not (is_existing_relation("parent", parent1, child) or is_existing_relation("parent", parent2, child)):
                         if all(unique_relationship(rel, names[2]) == 0 for rel in ["parent", "father", "mother"]):
                             # Assert parent relationships in Prolog
-                            prolog.assertz(f"parent({parent1}, {child})")
-                            prolog.assertz(f"parent({parent2}, {child})")
-                            prolog.assertz(f"person({parent1})")
-                            prolog.assertz(f"person({parent2})")
-                            print("OK! I learned something.")
+                            assert_fact(f"parent({parent1}, {child})")
+                            assert_fact(f"parent({parent2}, {child})")
+                            assert_fact(f"person({parent1})")
+                            assert_fact(f"person({parent2})")
 
                             # Add genderless facts if genders are undefined
                             for parent in [parent1, parent2]:
                                 if not (is_valid_gender(parent, "male") or is_valid_gender(parent, "female")):
-                                    prolog.assertz(f"genderless({parent})")
+                                    assert_fact(f"genderless({parent})")
+                            return Result(LEARNED, "parent")
                         else:
-                            print("That's impossible!")
+                            return Result(REJECTED, "parent", error=IMPOSSIBLE)
                     else:
-                        print(f"{names[0]} and {names[1]} are already parents of {names[2]}.")
+                        return Result(REJECTED, "parent", error=DUPLICATE, message=f"{names[0]} and {names[1]} are already parents of {names[2]}.")
                 else:
-                    print("That's impossible!")
-                return True
+                    return Result(REJECTED, "parent", error=IMPOSSIBLE)
             else:
                 return False
 
@@ -421,18 +426,16 @@ def process(sentence):
             if "Who" in sentence:
                 child_name_match = re.search(r'parents of (\w+)', sentence, re.IGNORECASE)
                 if child_name_match:
-                    print_parents(child_name_match.group(1))
-                    return True
+                    return find_parents(child_name_match.group(1))
                 else:
                     return False
 
             if len(names) == 3:
                 parent1, parent2, child = names[0].lower(), names[1].lower(), names[2].lower()
                 if is_existing_relation("parent", parent1, child) and is_existing_relation("parent", parent2, child):
-                    print("Yes!")
+                    return Result(ANSWERED, "parent", answer=True)
                 else:
-                    print("No!")
-                return True
+                    return Result(ANSWERED, "parent", answer=False)
             else:
                 return False
 
@@ -446,7 +449,7 @@ def process(sentence):
             "female", 
             ["child", "daughter"], 
             ["parent", "mother", "father"], 
-            print_daughters_of_parent
+            find_daughters_of_parent
         )
 
     # check for son relationships
@@ -458,7 +461,7 @@ def process(sentence):
             "male", 
             ["child", "son"], 
             ["parent", "mother", "father"], 
-            print_sons_of_parent
+            find_sons_of_parent
         )
 
     elif "children" in sentence:
@@ -480,16 +483,16 @@ def process(sentence):
                             unique_relationship("parent", names[n]) < 2
                         ):
                             # Assert parent-child relationships
-                            prolog.assertz(f"parent({names[-1].lower()}, {names[n].lower()})")
-                            prolog.assertz(f"person({names[n].lower()})")
+                            assert_fact(f"parent({names[-1].lower()}, {names[n].lower()})")
+                            assert_fact(f"person({names[n].lower()})")
                             if not is_valid_gender(names[n], "male") and not is_valid_gender(names[n], "female"):
-                                prolog.assertz(f"genderless({names[n].lower()})")
+                                assert_fact(f"genderless({names[n].lower()})")
                             
                             # Ensure parent existence
                             if not person_exists(names[-1], "person"):
-                                prolog.assertz(f"person({names[-1].lower()})")
+                                assert_fact(f"person({names[-1].lower()})")
                                 if not is_valid_gender(names[-1], "male") and not is_valid_gender(names[-1], "female"):
-                                    prolog.assertz(f"genderless({names[-1].lower()})")
+                                    assert_fact(f"genderless({names[-1].lower()})")
                             
                             learned = True
                         else:
@@ -497,13 +500,13 @@ def process(sentence):
                             break
 
                 if learned:
-                    print("OK! I learned something.")
+                    return Result(LEARNED, "child")
                 elif related or not unique:
-                    print("That's impossible!")
+                    return Result(REJECTED, "child", error=IMPOSSIBLE)
                 elif not learned:
-                    print(f"They are already children of {names[-1]}.")
+                    return Result(REJECTED, "child", error=DUPLICATE, message=f"They are already children of {names[-1]}.")
 
-            return True
+            return Result(REJECTED, "child", error=IMPOSSIBLE)
 
         # Handle "Who are the children of [parent]?" question
         elif "children of" in sentence and "?" in sentence:
@@ -514,14 +517,13 @@ def process(sentence):
                     is_existing_relation("child", names[n], names[-1]) 
                     for n in range(len(names) - 1)
                 )
-                print("Yes!" if all_children else "No!")
+                return Result(ANSWERED, "child", answer=all_children)
             else:
                 parent_name_match = re.search(r'children of (\w+)', sentence, re.IGNORECASE)
                 if parent_name_match:
-                    print_children_of_parent(parent_name_match.group(1))
+                    return find_children_of_parent(parent_name_match.group(1))
                 else:
                     return False
-            return True
 
     # Check for "child" relationship
     elif "child" in sentence:
@@ -542,25 +544,24 @@ def process(sentence):
                             unique_relationship("parent", child) < 2)
                         ):
                             # Assert parent-child relationship
-                            prolog.assertz(f"parent({parent}, {child})")
-                            prolog.assertz(f"person({child})")
+                            assert_fact(f"parent({parent}, {child})")
+                            assert_fact(f"person({child})")
                             if not is_valid_gender(child, "male") and not is_valid_gender(child, "female"):
-                                prolog.assertz(f"genderless({child})")
+                                assert_fact(f"genderless({child})")
                             
                             # Ensure parent existence
                             if not person_exists(parent, "person"):
-                                prolog.assertz(f"person({parent})")
+                                assert_fact(f"person({parent})")
                                 if not is_valid_gender(parent, "male") and not is_valid_gender(parent, "female"):
-                                    prolog.assertz(f"genderless({parent})")
+                                    assert_fact(f"genderless({parent})")
 
-                            print("OK! I learned something.")
+                            return Result(LEARNED, "child")
                         else:
-                            print("That's impossible!")
+                            return Result(REJECTED, "child", error=IMPOSSIBLE)
                     else:
-                        print(f"{names[0]} is already a child of {names[1]}.")
+                        return Result(REJECTED, "child", error=DUPLICATE, message=f"{names[0]} is already a child of {names[1]}.")
                 else:
-                    print("That's impossible!")
-                return True
+                    return Result(REJECTED, "child", error=IMPOSSIBLE)
             else:
                 return False
 
@@ -570,10 +571,9 @@ def process(sentence):
             if len(names) == 2:
                 child, parent = names[0].lower(), names[1].lower()
                 if is_existing_relation("parent", parent, child) or is_existing_relation("child", child, parent):
-                    print("Yes!")
+                    return Result(ANSWERED, "child", answer=True)
                 else:
-                    print("No!")
-                return True
+                    return Result(ANSWERED, "child", answer=False)
             return False
         
     # Check for aunt relationships
@@ -611,13 +611,12 @@ def process(sentence):
                 if cousin1 != cousin2 and are_related(excluded, inverse_excluded, names[0], names[1]):
                     if not is_existing_relation("cousin", cousin1, cousin2):
                         # Assert cousin relationship in Prolog
-                        prolog.assertz(f"cousin({cousin1}, {cousin2})")
-                        print("OK! I learned something.")
+                        assert_fact(f"cousin({cousin1}, {cousin2})")
+                        return Result(LEARNED, "cousin")
                     else:
-                        print("They are already cousins.")
+                        return Result(REJECTED, "cousin", error=DUPLICATE, message="They are already cousins.")
                 else:
-                    print("That's impossible!")
-                return True
+                    return Result(REJECTED, "cousin", error=IMPOSSIBLE)
             else:
                 return False
 
@@ -627,10 +626,9 @@ def process(sentence):
             if len(names) == 2:
                 cousin1, cousin2 = names[0].lower(), names[1].lower()
                 if is_existing_relation("cousin", cousin1, cousin2):
-                    print("Yes!")
+                    return Result(ANSWERED, "cousin", answer=True)
                 else:
-                    print("No!")
-                return True
+                    return Result(ANSWERED, "cousin", answer=False)
             else:
                 return False
 
@@ -644,15 +642,14 @@ def process(sentence):
 
                 # Validate logical consistency
                 if relative1 != relative2:
-                    if not is_existing_relation("relatives", relative1, relative2):
-                        # Assert relatives relationship in Prolog
-                        prolog.assertz(f"relatives({relative1}, {relative2})")
-                        print("OK! I learned something.")
+                    if not is_existing_relation("relative", relative1, relative2):
+                        # Assert relative/2, the predicate family_kb.pl defines
+                        assert_fact(f"relative({relative1}, {relative2})")
+                        return Result(LEARNED, "relatives")
                     else:
-                        print("They are already relatives.")
+                        return Result(REJECTED, "relatives", error=DUPLICATE, message="They are already relatives.")
                 else:
-                    print("That's impossible!")
-                return True
+                    return Result(REJECTED, "relatives", error=IMPOSSIBLE)
             else:
                 return False
 
@@ -661,123 +658,136 @@ def process(sentence):
             names.pop(0)
             if len(names) == 2:
                 relative1, relative2 = names[0].lower(), names[1].lower()
-                if is_existing_relation("relatives", relative1, relative2) or is_existing_relation("relatives", relative2, relative1):
-                    print("Yes!")
+                if is_existing_relation("relative", relative1, relative2) or is_existing_relation("relative", relative2, relative1):
+                    return Result(ANSWERED, "relatives", answer=True)
                 else:
-                    print("No!")
-                return True
+                    return Result(ANSWERED, "relatives", answer=False)
             else:
                 return False
             
-    try:
-        # Example return
-        if not sentence:
-            return "Invalid input given."
-        # Add logic to process the input
-        return "Processed successfully!"
-    except Exception as e:
-        return f"Error: {str(e)}"
+    return False
 
 # HELPER functions
 # Function to check if a relationship exists between two names
 def is_existing_relation(relation, name1, name2):
-    return bool(list(prolog.query(f"{relation}({name1.lower()}, {name2.lower()})")))
+    return query_exists(relation, name1.lower(), name2.lower())
+
+# Function to check if a goal has a solution, stopping at the first one.
+# Names are bound as arguments of a cached query template.
+def query_exists(predicate, *names):
+    prolog.start()
+    return template(predicate, "+" * len(names)).exists(*names)
+
+# Function to find who stands in a relationship to a name,
+# e.g. query_subjects("child", "john") for the children of john
+def query_subjects(predicate, name):
+    prolog.start()
+    return template(predicate, "-+").solutions(name.lower())
 
 def unique_relationship(relationship, name):
-    result = list(prolog.query(f"findall(X, {relationship}(X, {name.lower()}), Relationship), length(Relationship, Length)"))
-    return result[0]["Length"] if result else 0
+    return len(query_subjects(relationship, name))
 
 def are_related(excluded, inverse_excluded, name1, name2):
-    relations_copy = [r for r in relationships if r not in excluded]
-    relations_inverse = [r for r in relationships if r not in inverse_excluded]
-
-    return not any(
-        is_existing_relation(rel, name1, name2) for rel in relations_copy
-    ) and not any(
-        is_existing_relation(rel, name2, name1) for rel in relations_inverse
-    )
+    forward, backward = relations_between(name1, name2)
+    return not (forward & ~relation_mask(excluded)) and not (backward & ~relation_mask(inverse_excluded))
+
+# Function to combine relationship names into a bitmask
+def relation_mask(names):
+    mask = 0
+    for name in names:
+        mask |= relationship_bits.get(name, 0)
+    return mask
+
+# Function to find every relationship between two names in a single query
+# (relations_between/5 in family_kb.pl), returned as (name1 -> name2,
+# name2 -> name1) bitmasks
+def relations_between(name1, name2):
+    prolog.start()
+    [(forward, backward)] = template("relations_between", "+++--").solutions(
+        relationships, name1.lower(), name2.lower())
+    return relation_mask(forward), relation_mask(backward)
 
 # function to check if a given name has a specified gender and relationship
 def is_valid_gender(name, gender):
-    try:
-        return bool(list(prolog.query(f"{gender.lower()}({name.lower()})")))
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
+    return query_exists(gender.lower(), name.lower())
     
 # function to checking
 def person_exists(name, rs):
-    try:
-        return bool(list(prolog.query(f"{rs.lower()}({name.lower()})")))
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
-
-# Helper function to query Prolog and format results
-def print_relationship(query, relationship, subject_name, result_label):
-    results = list(prolog.query(query))
-    if results:
-        result_names = set([result[relationship].capitalize() for result in results])
-        if len(result_names) == 1:
-            print(f"The {result_label} of {subject_name} is {', '.join(result_names)}.")
-        else:
-            print(f"The {result_label} of {subject_name} are: {', '.join(result_names)}.")
-    else:
-        print(f"{subject_name} has no known {result_label.lower()}.")
-
-def print_children_of_parent(parent_name):
-    query = f"child(Child, {parent_name.lower()})"
-    print_relationship(query, "Child", parent_name, "children")
-
-def print_daughters_of_parent(parent_name):
-    query = f"daughter(Daughter, {parent_name.lower()})"
-    print_relationship(query, "Daughter", parent_name, "daughters")
-
-def print_sons_of_parent(parent_name):
-    query = f"son(Son, {parent_name.lower()})"
-    print_relationship(query, "Son", parent_name, "sons")
-
-def print_siblings(sibling_name):
-    query = f"siblings(Sibling, {sibling_name.lower()})"
-    print_relationship(query, "Sibling", sibling_name, "siblings")
-
-def print_sisters(sibling_name):
-    query = f"sister(Sister, {sibling_name.lower()})"
-    print_relationship(query, "Sister", sibling_name, "sisters")
-
-def print_brothers(sibling_name):
-    query = f"brother(Brother, {sibling_name.lower()})"
-    print_relationship(query, "Brother", sibling_name, "brothers")
-
-def print_mother(child_name):
-    query = f"mother(Mother, {child_name.lower()})"
-    print_relationship(query, "Mother", child_name, "mother")
-
-def print_father(child_name):
-    query = f"father(Father, {child_name.lower()})"
-    print_relationship(query, "Father", child_name, "father")
-
-def print_parents(child_name):
-    parent_query = f"parent(Parent, {child_name.lower()})"
-    parents = list(prolog.query(parent_query))
-    if parents:
-        parent_names = {parent["Parent"].capitalize() for parent in parents}
-        if len(parent_names) == 1:
-            print(f"The parent of {child_name} is {', '.join(parent_names)}.")
-        else:
-            print(f"The parents of {child_name} are: {', '.join(parent_names)}.")
-    else:
-        print(f"{child_name} has no known parents.")
+    return query_exists(rs.lower(), name.lower())
+
+# Helper function to query Prolog for a "Who" question. setof/3 removes
+# the duplicates of multiple derivations on the Prolog side.
+def find_relationship(relationship, subject_name, result_label):
+    prolog.start()
+    results = relation_set(relationship, subject_name.lower())
+    result_names = tuple(result.capitalize() for result in results)
+    return Result(ANSWERED, result_label, [subject_name], answer=result_names)
+
+def find_children_of_parent(parent_name):
+    return find_relationship("child", parent_name, "children")
+
+def find_daughters_of_parent(parent_name):
+    return find_relationship("daughter", parent_name, "daughters")
+
+def find_sons_of_parent(parent_name):
+    return find_relationship("son", parent_name, "sons")
+
+def find_siblings(sibling_name):
+    return find_relationship("siblings", sibling_name, "siblings")
+
+def find_sisters(sibling_name):
+    return find_relationship("sister", sibling_name, "sisters")
+
+def find_brothers(sibling_name):
+    return find_relationship("brother", sibling_name, "brothers")
+
+def find_mother(child_name):
+    return find_relationship("mother", child_name, "mother")
+
+def find_father(child_name):
+    return find_relationship("father", child_name, "father")
+
+def find_parents(child_name):
+    result = find_relationship("parent", child_name, "parents")
+    if len(result.answer) == 1:
+        result.relation = "parent"
+    return result
 
 def update_gender(individual, new_gender):
-    query = f"retract(genderless({individual.lower()})), assertz({new_gender}({individual.lower()}))."
-    list(prolog.query(query))
+    prolog.start()
+    if not retract_fact("genderless", individual.lower()):
+        return
+    assert_facts([(new_gender, (individual.lower(),))])
+    if journal:
+        journal.record(f"genderless({individual.lower()})", retract=True)
+        journal.record(f"{new_gender}({individual.lower()})")
+
+# Function to assert a fact and record it in the journal
+def assert_fact(fact):
+    prolog.start()
+    assert_facts([parse_fact(fact)])
+    if journal:
+        journal.record(fact)
+
+# Function to load the facts saved in a directory and keep journaling there
+def open_journal(directory):
+    global journal
+    journal = FactJournal(directory)
+    journal.load(prolog)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learn and answer family relationship sentences.")
+    parser.add_argument("--data", metavar="DIR", help="load learned facts from DIR and save new ones there")
+    args = parser.parse_args()
+    if args.data:
+        open_journal(args.data)
+
     print("Enter a prompt below.")
-    sentence = " "
-    while sentence.lower() != "quit":
-        sentence = input("\n> ")
-        # Process the input sentence, handle invalid input
-        if not process(sentence) and sentence.lower() != "quit":
-            print("Invalid input given.")
+    try:
+        while (sentence := input("\n> ")).lower() != "quit":
+            # Process the input sentence, handle invalid input
+            result = process(sentence)
+            print(result if result else "Invalid input given.")
+    finally:
+        if journal:
+            journal.close()
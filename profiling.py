@@ -0,0 +1,144 @@
+"""Opt-in instrumentation of the Prolog bridge and sentence processing.
+
+main.py wraps its hot paths in profiler.span(). While the profiler is
+disabled (the default) a span is a shared no-op object. Once enabled,
+every span records calls, wall time, self time, solutions and, for
+Prolog calls, inferences taken from statistics/2. Results can be saved
+as JSON or as folded stacks for flamegraph.pl / speedscope.
+
+Every thread keeps its own span stack, so spans opened by concurrent
+threads (e.g. query_service workers) do not nest into each other.
+"""
+import json
+import threading
+import time
+
+
+class _NullSpan:
+    """Span used while profiling is disabled."""
+
+    solutions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, kind, name, prolog_call):
+        self.profiler = profiler
+        self.frame = f"{kind}:{name}"
+        self.prolog_call = prolog_call
+        self.solutions = 0
+        self.inferences = 0
+        self.child_seconds = 0.0
+
+    def __enter__(self):
+        self.profiler._stack.append(self)
+        if self.prolog_call:
+            self._inferences_before = self.profiler.inferences()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        profiler = self.profiler
+        if self.prolog_call:
+            self.inferences += profiler.inferences() - self._inferences_before
+        profiler._stack.pop()
+        if profiler._stack:
+            parent = profiler._stack[-1]
+            parent.child_seconds += elapsed
+            parent.inferences += self.inferences
+        stack = ";".join([span.frame for span in profiler._stack] + [self.frame])
+        profiler.record(self.frame, stack, elapsed, elapsed - self.child_seconds,
+                        self.solutions, self.inferences)
+        return False
+
+
+class Profiler:
+    """Aggregates spans per frame ("<kind>:<name>") and per call stack."""
+
+    def __init__(self):
+        self.enabled = False
+        self.prolog = None
+        self.frames = {}
+        self.stacks = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _stack(self):
+        """The open spans of the calling thread, innermost last."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enable(self, prolog):
+        """Start recording; prolog, if given, is used to read inference counts."""
+        self.prolog = prolog
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.frames.clear()
+            self.stacks.clear()
+
+    def span(self, kind, name, prolog_call=False):
+        """Context manager timing one call; set .solutions inside it."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, kind, name, prolog_call)
+
+    def inferences(self):
+        if self.prolog is None:
+            return 0
+        result = list(self.prolog.query("statistics(inferences, I)"))
+        return result[0]["I"] if result else 0
+
+    def record(self, frame, stack, seconds, self_seconds, solutions, inferences):
+        with self._lock:
+            self._record(frame, stack, seconds, self_seconds, solutions, inferences)
+
+    def _record(self, frame, stack, seconds, self_seconds, solutions, inferences):
+        stats = self.frames.get(frame)
+        if stats is None:
+            stats = self.frames[frame] = {
+                "calls": 0,
+                "seconds": 0.0,
+                "self_seconds": 0.0,
+                "solutions": 0,
+                "inferences": 0,
+            }
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["self_seconds"] += self_seconds
+        stats["solutions"] += solutions
+        stats["inferences"] += inferences
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + self_seconds
+
+    def report(self):
+        """Return the frames sorted by total time, slowest first."""
+        return dict(sorted(self.frames.items(), key=lambda item: -item[1]["seconds"]))
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump({"frames": self.report(), "stacks": self.stacks}, stream, indent=2)
+
+    def save_folded(self, path):
+        """Write folded stacks ("a;b;c <microseconds>") for flamegraphs."""
+        with open(path, "w", encoding="utf-8") as stream:
+            for stack, seconds in sorted(self.stacks.items()):
+                stream.write(f"{stack} {round(seconds * 1e6)}\n")
+
+
+profiler = Profiler()
@@ -0,0 +1,234 @@
+"""Prolog goals built as terms instead of query text.
+
+Prolog.query() hands SWI-Prolog a string that is parsed again on every
+call. The helpers here put the goal together from cached functor handles
+and pass each name as an atom argument, so nothing is parsed and a name
+that happens to be an operator or keyword cannot break the goal. Query
+templates are cached per predicate and bound-argument pattern. Names stay
+atoms on the Prolog side: SWI-Prolog already interns every atom once,
+and snapshots and journals stay readable.
+
+Callers must have started Prolog (LazyProlog.start()) first.
+"""
+import contextlib
+import threading
+import time
+
+_functors = {}
+_limits = threading.local()
+
+
+class QueryAborted(Exception):
+    """A goal was stopped by the limits() of its thread."""
+
+
+class QueryTimeout(QueryAborted):
+    pass
+
+
+class QueryCancelled(QueryAborted):
+    pass
+
+
+@contextlib.contextmanager
+def limits(timeout=None, cancelled=None):
+    """Bound the term-based goals this thread runs inside the block.
+
+    timeout is in seconds for the whole block; Prolog stops a goal that
+    runs past it (see call_within_ms/2 in relationship.pl). cancelled is
+    a threading.Event checked before every goal.
+    """
+    previous = getattr(_limits, "value", None)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    _limits.value = (deadline, cancelled)
+    try:
+        yield
+    finally:
+        _limits.value = previous
+
+
+def remaining_ms():
+    """Return the milliseconds left under limits(), or None if unbounded."""
+    deadline, cancelled = getattr(_limits, "value", None) or (None, None)
+    if cancelled is not None and cancelled.is_set():
+        raise QueryCancelled()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise QueryTimeout()
+    return max(1, int(remaining * 1000))
+
+
+def functor(predicate, arity):
+    """Return the cached pyswip Functor for predicate/arity."""
+    key = (predicate, arity)
+    cached = _functors.get(key)
+    if cached is None:
+        from pyswip.easy import Functor
+
+        cached = _functors[key] = Functor(predicate, arity)
+    return cached
+
+
+def goal(predicate, *args):
+    """Build the term predicate(args...) from atoms."""
+    return functor(predicate, len(args))(*args)
+
+
+def attach_engine():
+    """Give the calling thread its own Prolog engine, once.
+
+    Engines share the clause database, so facts asserted from one thread
+    are visible to all of them.
+    """
+    from pyswip import Prolog
+
+    Prolog._init_prolog_thread()
+
+
+class QueryTemplate:
+    """A goal with a fixed predicate and bound-argument pattern.
+
+    The pattern has one character per argument: "+" for an atom passed
+    to exists()/solutions(), "-" for an argument the query solves for.
+    Every call opens its own query on the calling thread's engine, so
+    templates can be used from several threads at once.
+    """
+
+    def __init__(self, predicate, pattern):
+        from pyswip.core import PL_pred
+
+        self.predicate = predicate
+        self.pattern = pattern
+        self.functor = functor(predicate, len(pattern))
+        self.handle = PL_pred(self.functor.handle, None)
+        self.unbound = [i for i, mode in enumerate(pattern) if mode == "-"]
+
+    def exists(self, *names):
+        """Check if the goal has a solution, stopping at the first one."""
+        return bool(self.solutions(*names, limit=1))
+
+    def solutions(self, *names, limit=None):
+        """Return the values of the "-" arguments for each solution.
+
+        Each solution is a name, or a tuple of names if the pattern has
+        several "-" arguments.
+        """
+        from pyswip.core import (
+            PL_Q_CATCH_EXCEPTION, PL_Q_NODEBUG, PL_close_query, PL_cons_functor_v,
+            PL_discard_foreign_frame, PL_exception, PL_new_term_refs, PL_next_solution,
+            PL_open_foreign_frame, PL_open_query, PL_put_integer,
+        )
+        from pyswip.easy import getTerm, putTerm
+        from pyswip.prolog import PrologError
+
+        attach_engine()
+        timeout = remaining_ms()
+        results = []
+        # Term references die with the frame instead of piling up per call
+        frame = PL_open_foreign_frame()
+        try:
+            args = PL_new_term_refs(len(self.pattern))
+            names = iter(names)
+            for i, mode in enumerate(self.pattern):
+                if mode == "+":
+                    putTerm(args + i, next(names))
+            handle, query_args = self.handle, args
+            if timeout is not None:
+                handle, query_args = _timed_call(), PL_new_term_refs(2)
+                PL_put_integer(query_args, timeout)
+                PL_cons_functor_v(query_args + 1, self.functor.handle, args)
+            query = PL_open_query(None, PL_Q_NODEBUG | PL_Q_CATCH_EXCEPTION, handle, query_args)
+            try:
+                while (limit is None or len(results) < limit) and PL_next_solution(query):
+                    values = tuple(_value(getTerm(args + i)) for i in self.unbound)
+                    results.append(values[0] if len(values) == 1 else values)
+                error = PL_exception(query)
+                if error and str(getTerm(error)).startswith("time_limit_exceeded"):
+                    raise QueryTimeout()
+                if error:
+                    raise PrologError(f"{self.predicate}/{len(self.pattern)}: {getTerm(error)}")
+            finally:
+                PL_close_query(query)
+        finally:
+            PL_discard_foreign_frame(frame)
+        return results
+
+
+def _value(term):
+    """Convert an answer term to names: atoms to str, lists to lists."""
+    if isinstance(term, list):
+        return [_value(item) for item in term]
+    return str(term)
+
+
+def _timed_call():
+    """Return the predicate handle of call_within_ms/2."""
+    global _timed_call_handle
+    if _timed_call_handle is None:
+        from pyswip.core import PL_predicate
+
+        _timed_call_handle = PL_predicate("call_within_ms", 2, None)
+    return _timed_call_handle
+
+
+_timed_call_handle = None
+_templates = {}
+
+
+def template(predicate, pattern):
+    """Return the cached QueryTemplate for a predicate and pattern."""
+    key = (predicate, pattern)
+    cached = _templates.get(key)
+    if cached is None:
+        cached = _templates[key] = QueryTemplate(predicate, pattern)
+    return cached
+
+
+def goal_exists(predicate, *args):
+    """Check if a ground goal has a solution, stopping at the first one."""
+    return template(predicate, "+" * len(args)).exists(*args)
+
+
+def relation_set(relation, subject):
+    """Return the sorted, duplicate-free X with relation(X, subject)."""
+    return template("relation_set", "++-").solutions(relation, subject)[0]
+
+
+def relation_sets(relation, subjects):
+    """relation_set() for a list of subjects, in a single Prolog call."""
+    return template("relation_sets", "++-").solutions(relation, list(subjects))[0]
+
+
+def assert_facts(facts):
+    """assertz a list of (predicate, args) facts in one Prolog call.
+
+    The facts go to maplist(assertz, Facts) as a single list term.
+    """
+    from pyswip.core import PL_discard_foreign_frame, PL_open_foreign_frame
+
+    if not facts:
+        return
+    attach_engine()
+    # The fact terms die with the frame
+    frame = PL_open_foreign_frame()
+    try:
+        terms = [goal(predicate, *args) for predicate, args in facts]
+        if not template("maplist", "++").exists("assertz", terms):
+            raise RuntimeError(f"assertz failed for {len(terms)} facts")
+    finally:
+        PL_discard_foreign_frame(frame)
+
+
+def retract_fact(predicate, *args):
+    """retract one matching fact; return False if there was none."""
+    from pyswip.core import PL_discard_foreign_frame, PL_open_foreign_frame
+    from pyswip.easy import call
+
+    attach_engine()
+    frame = PL_open_foreign_frame()
+    try:
+        return bool(call(functor("retract", 1)(goal(predicate, *args))))
+    finally:
+        PL_discard_foreign_frame(frame)
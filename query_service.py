@@ -0,0 +1,217 @@
+"""Answer sentences from many threads at once.
+
+QueryService runs main.py's sentence handling on a thread pool. Each
+worker thread gets its own SWI-Prolog engine (see prolog_terms), and all
+engines share one clause database. Questions hold a shared read lock and
+run concurrently; assertions hold the write lock, so facts, the index
+and the query cache only change while no question is being answered.
+
+Example:
+
+    with QueryService(workers=8) as service:
+        futures = [service.submit(sentence) for sentence in sentences]
+        results = [future.result() for future in futures]
+
+AsyncQueryService puts an asyncio API in front of the pool:
+
+    service = AsyncQueryService(max_pending=64, timeout=2.0)
+    result = await service.ask("Are Ann and Bob siblings?")
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from prolog_terms import QueryCancelled, QueryTimeout, limits, remaining_ms
+from results import CANCELLED, FAILED, INVALID, TIMEOUT, Result
+
+# Questions waiting for or running on the pool, per AsyncQueryService
+MAX_PENDING = 256
+
+# Seconds between cancellation checks of a bounded lock wait
+LOCK_POLL = 0.05
+
+
+class ReadWriteLock:
+    """Many readers or one writer; waiting writers block new readers.
+
+    With bounded=True, the acquire methods give up at the deadline or
+    cancellation of the thread's prolog_terms.limits() and raise
+    QueryTimeout/QueryCancelled.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def _wait(self, bounded):
+        if not bounded:
+            self._condition.wait()
+            return
+        remaining = remaining_ms()
+        self._condition.wait(LOCK_POLL if remaining is None else min(LOCK_POLL, remaining / 1000))
+
+    def acquire_read(self, bounded=False):
+        with self._condition:
+            if bounded:
+                remaining_ms()
+            while self._writer or self._writers_waiting:
+                self._wait(bounded)
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self, bounded=False):
+        with self._condition:
+            if bounded:
+                remaining_ms()
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._wait(bounded)
+            except BaseException:
+                self._writers_waiting -= 1
+                # Readers held back by this writer may go on
+                self._condition.notify_all()
+                raise
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class QueryService:
+    """Thread pool answering main.py sentences; submit() returns futures.
+
+    A future's result is the sentence's results.Result, or None if the
+    sentence was not understood.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.lock = ReadWriteLock()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="query")
+        main.backend.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        return False
+
+    def submit(self, sentence, timeout=None, cancelled=None):
+        """Schedule a sentence; return a concurrent.futures.Future."""
+        return self._executor.submit(self.process, sentence, timeout, cancelled)
+
+    def map(self, sentences):
+        """Answer sentences concurrently, yielding results in order."""
+        return self._executor.map(self.process, sentences)
+
+    def process(self, sentence, timeout=None, cancelled=None):
+        """Answer one sentence on the calling thread.
+
+        timeout (seconds) and cancelled (a threading.Event) bound the
+        wait for the lock and the Prolog goals of a question, and raise
+        QueryTimeout/QueryCancelled. Assertions are only bounded while
+        waiting for the lock; once it is held they run to completion so
+        no half-learned sentence is left behind.
+        """
+        parsed = main.parse_sentence(sentence)
+        if parsed is None:
+            return None
+        # One deadline covers the lock wait and the question's goals
+        with limits(timeout, cancelled):
+            if parsed[0].endswith("?"):
+                self.lock.acquire_read(bounded=True)
+                try:
+                    return main.run_parsed(parsed)
+                finally:
+                    self.lock.release_read()
+            self.lock.acquire_write(bounded=True)
+        try:
+            return main.run_parsed(parsed)
+        finally:
+            self.lock.release_write()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncQueryService:
+    """asyncio front end of QueryService.
+
+    At most max_pending sentences are queued or running; further ask()
+    calls wait for a slot. Identical questions asked while one is in
+    flight share its result. Once every caller waiting for a question
+    has been cancelled, the question stops at its next lock wait or
+    Prolog goal; a goal already running is bounded only by the timeout.
+    """
+
+    def __init__(self, workers=None, max_pending=MAX_PENDING, timeout=None):
+        self.service = QueryService(workers)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_pending)
+        # sentence -> (task, cancel event, [waiter count])
+        self._in_flight = {}
+
+    async def ask(self, sentence, timeout=None):
+        """Process a sentence and return its results.Result."""
+        sentence = " ".join(sentence.split())
+        timeout = self.timeout if timeout is None else timeout
+        if not sentence.endswith("?"):
+            return await self._run(sentence, timeout, threading.Event())
+
+        entry = self._in_flight.get(sentence)
+        if entry is None:
+            cancelled = threading.Event()
+            task = asyncio.ensure_future(self._run(sentence, timeout, cancelled))
+            entry = self._in_flight[sentence] = (task, cancelled, [0])
+            task.add_done_callback(lambda _: self._forget(sentence, entry))
+        task, cancelled, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1:
+                cancelled.set()
+                task.cancel()
+                # Later callers start over instead of sharing the cancelled task
+                self._forget(sentence, entry)
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _forget(self, sentence, entry):
+        if self._in_flight.get(sentence) is entry:
+            del self._in_flight[sentence]
+
+    async def _run(self, sentence, timeout, cancelled):
+        async with self._slots:
+            work = self.service.submit(sentence, timeout, cancelled)
+            try:
+                result = await asyncio.wrap_future(work)
+            except QueryTimeout:
+                return Result(FAILED, error=TIMEOUT)
+            except QueryCancelled:
+                return Result(FAILED, error=CANCELLED)
+            except asyncio.CancelledError:
+                # The worker stops at its next lock wait or Prolog goal;
+                # the slot stays taken until it has
+                cancelled.set()
+                await asyncio.gather(asyncio.wrap_future(work), return_exceptions=True)
+                raise
+        return result or Result(FAILED, error=INVALID)
+
+    def close(self):
+        self.service.shutdown()
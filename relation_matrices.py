@@ -0,0 +1,202 @@
+"""Whole-base relation sweeps with sparse matrix products.
+
+Answering "all cousin pairs" one goal at a time takes a query per pair
+of people. RelationMatrices instead turns the parent/2 facts of a
+FamilyIndex into a sparse adjacency matrix P (P[x, y] is parent(x, y))
+and derives each relation of relationship.pl with a few products:
+
+    siblings       connected components of P^T P and siblings_direct
+    grandparent    P P
+    aunt_or_uncle  S P               (S: siblings)
+    cousin         P^T S P, without the diagonal
+    grandchild     grandparent^T
+
+Gendered relations keep the rows of one gender. Explicitly asserted
+facts are added where relationship.pl would see them.
+
+Requires numpy and scipy, which are only imported here. Example:
+
+    python relation_matrices.py --data DIR cousin grandparent --output pairs.csv
+"""
+import argparse
+import csv
+import sys
+
+from backends import RELATIVE_RELATIONS
+from family_index import GENDER_CODES, GENDERED
+
+# Relations RelationMatrices can derive
+MATRIX_RELATIONS = ("parent", "child", "siblings", "grandparent", "grandchild",
+                    "aunt_or_uncle", "cousin", "relative", *GENDERED)
+
+
+class RelationMatrices:
+    """Boolean sparse matrices of every relation over a FamilyIndex.
+
+    matrix(relation)[x, y] is relation(x, y) for person IDs x and y.
+    Matrices are derived on first use and reflect the index at the time
+    RelationMatrices was created.
+    """
+
+    def __init__(self, index):
+        import numpy as np
+
+        self.index = index
+        self.size = len(index.people)
+        self.names = list(index.people.names)
+        codes = np.frombuffer(bytes(index.gender_codes), dtype=np.uint8)
+        self.genders = {gender: codes == code for gender, code in GENDER_CODES.items()}
+        self._matrices = {"parent": self._pair_matrix(
+            (parent, child) for child, parents in index.parents.items() for parent in parents)}
+
+    def _pair_matrix(self, pairs):
+        import numpy as np
+        from scipy import sparse
+
+        pairs = list(pairs)
+        rows = np.fromiter((pair[0] for pair in pairs), dtype=np.int32, count=len(pairs))
+        cols = np.fromiter((pair[1] for pair in pairs), dtype=np.int32, count=len(pairs))
+        data = np.ones(len(pairs), dtype=bool)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(self.size, self.size), dtype=bool)
+
+    def _facts(self, predicate):
+        """Return the explicitly asserted facts of a predicate as a matrix."""
+        table = self.index.facts.get(predicate)
+        if table is None:
+            return None
+        return self._pair_matrix(
+            (person1, person2) for person1, targets in table.forward.items() for person2 in targets)
+
+    def matrix(self, relation):
+        """Return the boolean CSR matrix of a relation."""
+        cached = self._matrices.get(relation)
+        if cached is None:
+            if relation not in MATRIX_RELATIONS:
+                raise KeyError(relation)
+            cached = self._derive(relation)
+            if relation != "grandparent":
+                facts = self._facts(relation)
+                if facts is not None:
+                    cached = cached + facts
+            self._matrices[relation] = cached
+        return cached
+
+    def _derive(self, relation):
+        parent = self.matrix("parent")
+        if relation == "child":
+            return parent.T.tocsr()
+        if relation == "siblings":
+            return self._siblings()
+        if relation == "grandparent":
+            # grandfather/2 and grandmother/2 see the asserted facts too
+            derived = _boolean(parent @ parent)
+            facts = self._facts("grandparent")
+            return derived if facts is None else derived + facts
+        if relation == "grandchild":
+            # grandchild(X, Y) :- grandparent(Y, X).
+            return self.matrix("grandparent").T.tocsr()
+        if relation == "aunt_or_uncle":
+            return _boolean(self.matrix("siblings") @ parent)
+        if relation == "cousin":
+            return _without_diagonal(_boolean(parent.T @ self.matrix("siblings") @ parent))
+        if relation == "relative":
+            result = self.matrix(RELATIVE_RELATIONS[0])
+            for part in RELATIVE_RELATIONS[1:]:
+                result = result + self.matrix(part)
+            return result
+        base, gender = GENDERED[relation]
+        if base == "child":
+            # son/2 and daughter/2 read parent/2, not asserted child/2 facts
+            base_matrix = parent.T.tocsr()
+        elif base == "aunt_or_uncle":
+            base_matrix = self._derive(base)
+        else:
+            base_matrix = self.matrix(base)
+        return self._rows_of(gender, base_matrix)
+
+    def _siblings(self):
+        """siblings/2: people linked by siblings_direct or a shared parent."""
+        import numpy as np
+        from scipy import sparse
+        from scipy.sparse.csgraph import connected_components
+
+        parent = self.matrix("parent")
+        # The index folds siblings_direct/2 facts into its sibling groups;
+        # linking each member to the first one keeps the same components
+        direct = self._pair_matrix(
+            (group[0], member) for group in self.index.sibling_groups() for member in group[1:])
+        links = _without_diagonal(_boolean(parent.T @ parent)) + direct
+        _, labels = connected_components(links, directed=False)
+        # People with no link are alone in their component and end up on
+        # the diagonal only
+        members = sparse.csr_matrix(
+            (np.ones(self.size, dtype=bool), (np.arange(self.size), labels)),
+            shape=(self.size, self.size), dtype=bool)
+        return _without_diagonal(_boolean(members @ members.T))
+
+    def _rows_of(self, gender, matrix):
+        """Keep the rows of people of one gender."""
+        import numpy as np
+        from scipy import sparse
+
+        return _boolean(sparse.diags(self.genders[gender].astype(np.int8), dtype=np.int8) @ matrix)
+
+    def count(self, relation):
+        """Return the number of pairs of a relation."""
+        return self.matrix(relation).nnz
+
+    def pairs(self, relation):
+        """Yield the (name, name) pairs of a relation, sorted by ID."""
+        matrix = self.matrix(relation).copy()
+        matrix.sort_indices()
+        matrix = matrix.tocoo()
+        names = self.names
+        for person1, person2 in zip(matrix.row.tolist(), matrix.col.tolist()):
+            yield names[person1], names[person2]
+
+    def export_csv(self, stream, relations):
+        """Write relation,name,name rows for every pair of the relations."""
+        writer = csv.writer(stream)
+        for relation in relations:
+            writer.writerows((relation, *pair) for pair in self.pairs(relation))
+
+
+def _boolean(matrix):
+    """Turn a product into a boolean CSR matrix of its nonzero entries."""
+    matrix = matrix.tocsr()
+    matrix.eliminate_zeros()
+    return matrix.astype(bool)
+
+
+def _without_diagonal(matrix):
+    from scipy import sparse
+
+    matrix = matrix.tocoo()
+    keep = matrix.row != matrix.col
+    return sparse.csr_matrix((matrix.data[keep], (matrix.row[keep], matrix.col[keep])),
+                             shape=matrix.shape, dtype=bool)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export every pair of some relations as CSV.")
+    parser.add_argument("relations", nargs="+", choices=MATRIX_RELATIONS)
+    parser.add_argument("--data", metavar="DIR", required=True, help="directory of the saved facts (see main.py --data)")
+    parser.add_argument("--output", metavar="FILE", help="CSV file to write (default: stdout)")
+    args = parser.parse_args()
+
+    import main
+
+    # The graph backend loads the facts into main.family_index without Prolog
+    main.use_backend("graph")
+    main.open_journal(args.data)
+    try:
+        matrices = RelationMatrices(main.family_index)
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as stream:
+                matrices.export_csv(stream, args.relations)
+            for relation in args.relations:
+                print(f"{relation}: {matrices.count(relation)} pairs")
+        else:
+            matrices.export_csv(sys.stdout, args.relations)
+    finally:
+        main.journal.close()
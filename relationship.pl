@@ -1,9 +1,8 @@
 % Declare dynamic predicates to allow updates at runtime
-:- dynamic parent/2.
-:- dynamic male/1.
-:- dynamic female/1.
+% Facts the tabled rules depend on are incremental, so asserting them
+% invalidates the affected tables automatically.
+:- dynamic([parent/2, male/1, female/1, siblings_direct/2], [incremental(true)]).
 :- dynamic person/1.
-:- dynamic siblings/2.
 :- dynamic brother/2.
 :- dynamic sister/2.
 :- dynamic father/2.
@@ -22,7 +21,11 @@
 :- dynamic relative/2.
 :- dynamic genderless/1.
 :- dynamic safe_add_parent/2.
-:- dynamic siblings_direct/2.
+
+% Recursive closures are tabled: each pair is derived once and the left
+% recursion terminates.
+:- table siblings/2 as incremental.
+:- table has_cycle/2 as incremental.
 
 
 % Rules for family relationships
@@ -36,10 +39,18 @@ child(X, Y) :- parent(Y, X).
 son(X, Y) :- male(X), parent(Y, X).
 daughter(X, Y) :- female(X), parent(Y, X).
 
-% Base sibling facts (direct relationships)
-siblings(X, Y) :- siblings_direct(X, Y).
-siblings(X, Y) :- siblings_direct(Y, X).
-siblings(X, Y) :- siblings_direct(X, Z), siblings(Z, Y), X \= Y, \+ siblings_direct(X, Y).
+% Base sibling facts (direct relationships, in either direction)
+sibling_link(X, Y) :- siblings_direct(X, Y).
+sibling_link(X, Y) :- siblings_direct(Y, X).
+% Children who share a parent are siblings too. siblings/2 used to
+% follow siblings_direct/2 only; with this link the closure below also
+% joins half-sibling sets: if X and Y share one parent and Y and Z
+% another, X and Z are siblings although they have no parent in common.
+sibling_link(X, Y) :- parent(P, X), parent(P, Y), X \== Y.
+
+% Transitive sibling closure
+siblings(X, Y) :- sibling_link(X, Y), X \== Y.
+siblings(X, Y) :- siblings(X, Z), sibling_link(Z, Y), X \== Y.
 
 % Adding gendered sibling relationships
 brother(X, Y) :-
@@ -59,7 +70,7 @@ grandfather(X, Y) :- male(X), grandparent(X, Y).
 grandmother(X, Y) :- female(X), grandparent(X, Y).
 
 % Grandchild relationships
-grandchild(X, Y) :- child(X, Z), grandparent(Y, Z).
+grandchild(X, Y) :- grandparent(Y, X).
 
 % Uncle and Aunt relationships
 uncle(X, Y) :-
@@ -120,3 +131,20 @@ safe_add_parent(X, Y) :-
 learn_fact(Fact) :-
     \+ contradiction,
     assert(Fact). % Add a fact dynamically if it's logically valid.
+
+% Run Goal, raising time_limit_exceeded after Ms milliseconds. Used by
+% prolog_terms.py, whose C interface cannot pass floats.
+call_within_ms(Ms, Goal) :-
+    Seconds is Ms / 1000,
+    call_with_time_limit(Seconds, Goal).
+
+% Sorted, duplicate-free answers X of Relation(X, Subject); [] if none
+relation_set(Relation, Subject, Set) :-
+    (   setof(X, call(Relation, X, Subject), Set)
+    ->  true
+    ;   Set = []
+    ).
+
+% relation_set/3 for every subject of a list, in one call
+relation_sets(Relation, Subjects, Sets) :-
+    maplist(relation_set(Relation), Subjects, Sets).
@@ -0,0 +1,81 @@
+"""Outcome of one sentence, returned by main.py and maintest.py.
+
+The processing functions return Result objects; text is rendered with
+str() only at the edge (the command-line loops, the GUI, services).
+"""
+
+# Result.status
+LEARNED = "learned"
+REJECTED = "rejected"
+ANSWERED = "answered"
+FAILED = "failed"
+
+# Result.error, for rejected and failed sentences
+DUPLICATE = "duplicate"
+IMPOSSIBLE = "impossible"
+INVALID = "invalid"
+PROLOG = "prolog"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+
+class Result:
+    """Status, relation, answer and error kind of one sentence.
+
+    answer is True/False for yes/no questions, None when there is not
+    enough information, a tuple of names for "Who" questions, whose
+    subject is names[0], and a kinship term such as "first cousin" (or
+    None) for "How is X related to Y?". message overrides the default
+    text.
+    """
+
+    __slots__ = ("status", "relation", "names", "answer", "error", "message")
+
+    def __init__(self, status, relation=None, names=(), answer=None, error=None, message=None):
+        self.status = status
+        self.relation = relation
+        self.names = tuple(names)
+        self.answer = answer
+        self.error = error
+        self.message = message
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Result({fields})"
+
+    def __str__(self):
+        if self.message is not None:
+            return self.message
+        if self.status == LEARNED:
+            return "OK! I learned something."
+        if self.status == ANSWERED and self.relation == "kinship":
+            person, other = self.names
+            if self.answer is None:
+                return f"{person} and {other} are not known to be related."
+            return f"{person} is {other}'s {self.answer}."
+        if self.status == ANSWERED and isinstance(self.answer, tuple):
+            subject = self.names[0]
+            if not self.answer:
+                return f"{subject} has no known {self.relation.lower()}."
+            if len(self.answer) == 1:
+                return f"The {self.relation} of {subject} is {self.answer[0]}."
+            return f"The {self.relation} of {subject} are: {', '.join(self.answer)}."
+        if self.status == ANSWERED:
+            return "Yes!" if self.answer else "No!"
+        if self.error == IMPOSSIBLE:
+            return "That's impossible!"
+        if self.error == INVALID:
+            return "Invalid input given."
+        return f"Error: {self.error}"
+
+    def to_dict(self):
+        """Return the fields as a JSON-serializable dict."""
+        answer = list(self.answer) if isinstance(self.answer, tuple) else self.answer
+        return {
+            "status": self.status,
+            "relation": self.relation,
+            "names": list(self.names),
+            "answer": answer,
+            "error": self.error,
+            "text": str(self),
+        }
@@ -0,0 +1,71 @@
+"""Check CompactFamilyStore against the FamilyIndex it copies.
+
+    python -m pytest -q test_compact_store.py
+"""
+import random
+import unittest
+
+from compact_store import CompactFamilyStore
+from family_index import FamilyIndex
+from test_relations import FAMILIES, random_facts
+
+# Facts CompactFamilyStore.from_facts() reads; the others are ignored
+STORED_FACTS = ("parent", "siblings_direct", "male", "female")
+
+
+class CompactFamilyStoreTest(unittest.TestCase):
+
+    def families(self):
+        rng = random.Random(2025)
+        for _ in range(FAMILIES):
+            facts = [(predicate, names) for predicate, names in random_facts(rng)
+                     if predicate in STORED_FACTS]
+            index = FamilyIndex()
+            for predicate, names in facts:
+                index.add_fact(predicate, *names)
+            yield facts, index
+
+    def check(self, store, index):
+        self.assertEqual(len(store), len(index.people))
+        for person in range(len(index.people)):
+            name = index.name(person)
+            self.assertEqual(store.lookup(name), person)
+            self.assertEqual(store.gender(person), index.gender(person))
+            self.assertEqual(set(store.parents(person)), set(index.parents.get(person, ())))
+            self.assertEqual(set(store.children(person)), set(index.children.get(person, ())))
+            self.assertEqual(set(store.siblings(person)), set(index.group_members(person)) - {person})
+            self.assertEqual(sorted(store.get_all_parents(name)),
+                             sorted(index.name(parent) for parent in index.parents.get(person, ())))
+            self.assertEqual(store.get_gender(name.capitalize()), index.gender(person))
+
+    def test_from_index(self):
+        for facts, index in self.families():
+            self.check(CompactFamilyStore.from_index(index), index)
+
+    def test_from_facts(self):
+        for facts, index in self.families():
+            self.check(CompactFamilyStore.from_facts(facts), index)
+
+    def test_lookup(self):
+        store = CompactFamilyStore.from_facts([("parent", ("bob", "ann")), ("male", ("bob",)),
+                                               ("siblings_direct", ("ann", "cy"))])
+        self.assertEqual([store.lookup(name) for name in ("bob", "ann", "cy")], [0, 1, 2])
+        self.assertIsNone(store.lookup("al"))
+        self.assertIsNone(store.lookup("zed"))
+        self.assertEqual(store.get_all_parents("Zed"), [])
+        self.assertIsNone(store.get_gender("Zed"))
+        self.assertEqual(store.siblings(0), [])
+        self.assertEqual(store.siblings(1), [2])
+        record = store.person(0)
+        self.assertEqual((record.id, record.name, record.gender), (0, "bob", "male"))
+
+    def test_nbytes(self):
+        store = CompactFamilyStore.from_facts([("parent", ("ann", "bob"))])
+        names, rest = store.nbytes()
+        # "annbob" plus three 4-byte name offsets
+        self.assertEqual(names, 6 + 3 * 4)
+        self.assertGreater(rest, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
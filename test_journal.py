@@ -0,0 +1,109 @@
+"""Tests of the fact journal: replay, torn lines and snapshots.
+
+    python -m pytest -q test_journal.py
+"""
+import os
+import tempfile
+import unittest
+
+from journal import (FactJournal, fact_indicator, parse_fact, read_snapshot,
+                     write_snapshot)
+
+
+class RecordingProlog:
+    """Records the files consulted and goals queried by FactJournal.load()."""
+
+    def __init__(self):
+        self.consulted = []
+        self.goals = []
+
+    def consult(self, path):
+        self.consulted.append(path)
+
+    def query(self, goal):
+        self.goals.append(goal)
+        return iter([{}])
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+
+    def test_parse_fact(self):
+        self.assertEqual(parse_fact("parent(ann, bob)"), ("parent", ("ann", "bob")))
+        self.assertEqual(parse_fact("male(bob)"), ("male", ("bob",)))
+        self.assertEqual(fact_indicator("parent(ann, bob)"), "parent/2")
+        self.assertEqual(fact_indicator("male(bob)"), "male/1")
+
+    def test_replay(self):
+        journal = FactJournal(self.path)
+        journal.record("parent(ann, bob)")
+        journal.record("male(bob)")
+        journal.record("parent(ann, bob)", retract=True)
+        journal.record("female(ann)")
+        journal.sync()
+        self.assertEqual(journal.facts(), ["male(bob)", "female(ann)"])
+        # Stop without close(), which would compact, as a crash would
+        journal._stream.close()
+
+        reopened = FactJournal(self.path)
+        self.assertEqual(reopened.entries, 4)
+        self.assertEqual(reopened.facts(), ["male(bob)", "female(ann)"])
+        reopened._stream.close()
+
+    def test_torn_line(self):
+        with open(os.path.join(self.path, "journal.log"), "w", encoding="utf-8") as stream:
+            stream.write("+parent(ann, bob)\n+male(b")
+        journal = FactJournal(self.path)
+        self.assertEqual(journal.facts(), ["parent(ann, bob)"])
+        journal.record("male(bob)")
+        journal.close()
+        self.assertEqual(read_snapshot(journal.snapshot_path), ["parent(ann, bob)", "male(bob)"])
+
+    def test_snapshot(self):
+        journal = FactJournal(self.path, snapshot_every=3)
+        for fact in ["parent(ann, bob)", "female(ann)", "parent(bob, cy)"]:
+            journal.record(fact)
+        # The third line folds the journal into the snapshot
+        self.assertEqual(journal.entries, 0)
+        self.assertEqual(journal.read_journal(), [])
+        self.assertEqual(read_snapshot(journal.snapshot_path),
+                         ["parent(ann, bob)", "female(ann)", "parent(bob, cy)"])
+        journal.record("female(ann)", retract=True)
+        journal.close()
+        self.assertEqual(read_snapshot(journal.snapshot_path), ["parent(ann, bob)", "parent(bob, cy)"])
+        with open(journal.snapshot_path, encoding="utf-8") as stream:
+            self.assertIn(":- multifile parent/2.\n", stream.read())
+
+    def test_load(self):
+        write_snapshot(os.path.join(self.path, "snapshot.pl"),
+                       ["parent(ann, bob)", "female(ann)"])
+        journal = FactJournal(self.path)
+        journal.record("female(ann)", retract=True)
+        journal.record("male(bob)")
+        journal.sync()
+        prolog = RecordingProlog()
+        journal.load(prolog)
+        journal._stream.close()
+        self.assertEqual(prolog.consulted, [journal.snapshot_path])
+        # Only the difference from the snapshot is replayed
+        self.assertEqual(prolog.goals, ["retract(female(ann)), assertz(male(bob))"])
+
+    def test_load_after_crash(self):
+        # A crash between writing the snapshot and emptying the journal
+        # leaves lines the snapshot already holds
+        write_snapshot(os.path.join(self.path, "snapshot.pl"), ["parent(ann, bob)"])
+        with open(os.path.join(self.path, "journal.log"), "w", encoding="utf-8") as stream:
+            stream.write("+parent(ann, bob)\n")
+        journal = FactJournal(self.path)
+        prolog = RecordingProlog()
+        journal.load(prolog)
+        journal._stream.close()
+        self.assertEqual(prolog.goals, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Tests of main.py's batch mode and kinship terms, on the graph backend.
+
+The graph backend answers from main.family_index, so these run without
+SWI-Prolog.
+
+    python -m pytest -q test_main.py
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from journal import FactJournal
+from results import ANSWERED, FAILED
+
+
+def use_graph_backend():
+    """Start from an empty knowledge base on the graph backend."""
+    main.family_index.clear()
+    main.fact_batch.facts = []
+    main.use_backend("graph")
+
+
+class ProcessBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        use_graph_backend()
+
+    def test_counts(self):
+        answers = []
+        counts = main.process_batch([
+            "Ann is the mother of Bob.",
+            "Bob is the father of Cy.",
+            "Ann is the mother of Bob.",
+            "Cy is the father of Cy.",
+            "Bob is the father of Ann.",
+            "Ann is a brother of Dan.",
+            "Hello there.",
+            "Is Ann a grandmother of Cy?",
+            "Who are the children of Ann?",
+        ], on_answer=answers.append)
+        self.assertEqual(counts, {"learned": 2, "duplicate": 1, "impossible": 3,
+                                  "invalid": 1, "answered": 2, "failed": 0})
+        self.assertEqual([result.status for result in answers], [ANSWERED, ANSWERED])
+        self.assertTrue(answers[0].answer)
+        self.assertEqual(list(answers[1].answer), ["Bob"])
+
+    def test_failed_questions(self):
+        main.process_batch(["Ann is the mother of Bob."], on_answer=None)
+        answers = []
+        with mock.patch.object(main.backend, "exists", side_effect=RuntimeError("down")):
+            counts = main.process_batch(["Is Ann the mother of Bob?"], on_answer=answers.append)
+        self.assertEqual(counts["failed"], 1)
+        self.assertEqual(counts["answered"], 0)
+        self.assertEqual(answers[0].status, FAILED)
+
+    def test_chunks(self):
+        sentences = [f"P{letter} is the father of C{letter}." for letter in "abcdefg"]
+        with mock.patch.object(main.backend, "assert_facts",
+                               wraps=main.backend.assert_facts) as assert_facts:
+            counts = main.process_batch(sentences, chunk_size=3)
+        self.assertEqual(counts["learned"], 7)
+        # Two facts per sentence (parent and gender); a chunk is flushed
+        # once it holds chunk_size facts, and the rest at the end
+        self.assertEqual([len(call.args[0]) for call in assert_facts.call_args_list], [4, 4, 4, 2])
+        self.assertFalse(main.fact_batch.open)
+        self.assertEqual(main.get_all_parents("Cg"), ["pg"])
+
+    def test_journal_after_flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            main.journal = FactJournal(directory)
+            try:
+                main.process_batch(["Ann is the mother of Bob."])
+                with mock.patch.object(main.backend, "assert_facts", side_effect=RuntimeError("down")):
+                    with self.assertRaises(RuntimeError):
+                        main.process_batch(["Cy is the father of Dan."])
+                main.journal.sync()
+                self.assertEqual(main.journal.facts(), ["parent(ann, bob)", "female(ann)"])
+            finally:
+                main.journal.close()
+                main.journal = None
+
+
+class KinshipTermTest(unittest.TestCase):
+
+    def test_direct_lines(self):
+        self.assertEqual(main.kinship_term(0, 1), "parent")
+        self.assertEqual(main.kinship_term(0, 1, "female"), "mother")
+        self.assertEqual(main.kinship_term(0, 2, "male"), "grandfather")
+        self.assertEqual(main.kinship_term(0, 4), "great-great-grandparent")
+        self.assertEqual(main.kinship_term(1, 0, "male"), "son")
+        self.assertEqual(main.kinship_term(3, 0), "great-grandchild")
+
+    def test_collateral_lines(self):
+        self.assertEqual(main.kinship_term(1, 1, "female"), "sister")
+        self.assertEqual(main.kinship_term(1, 1), "sibling")
+        self.assertEqual(main.kinship_term(1, 2), "aunt or uncle")
+        self.assertEqual(main.kinship_term(1, 3, "male"), "great-uncle")
+        self.assertEqual(main.kinship_term(2, 1), "niece or nephew")
+        self.assertEqual(main.kinship_term(3, 1, "female"), "great-niece")
+
+    def test_cousins(self):
+        self.assertEqual(main.kinship_term(2, 2), "first cousin")
+        self.assertEqual(main.kinship_term(3, 2), "first cousin once removed")
+        self.assertEqual(main.kinship_term(2, 4, "male"), "first cousin twice removed")
+        self.assertEqual(main.kinship_term(4, 4), "third cousin")
+        self.assertEqual(main.kinship_term(3, 7), "second cousin 4 times removed")
+        self.assertEqual(main.kinship_term(13, 13), "12th cousin")
+
+    def test_kinship(self):
+        use_graph_backend()
+        main.process_batch([
+            "Ann is the mother of Bob.",
+            "Ann is the mother of Cat.",
+            "Bob is the father of Dan.",
+            "Cat is the mother of Eve.",
+            "Fay is a sister of Gus.",
+        ])
+        self.assertEqual(main.kinship("Ann", "Dan"), "grandmother")
+        self.assertEqual(main.kinship("Bob", "Eve"), "uncle")
+        self.assertEqual(main.kinship("Dan", "Eve"), "first cousin")
+        self.assertEqual(main.kinship("Fay", "Gus"), "sister")
+        self.assertIsNone(main.kinship("Dan", "Gus"))
+        self.assertIsNone(main.kinship("Ann", "Ann"))
+        self.assertIsNone(main.kinship("Ann", "Zed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
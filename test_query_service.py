@@ -0,0 +1,144 @@
+"""Tests of QueryService locking and cancellation, on the graph backend.
+
+    python -m pytest -q test_query_service.py
+"""
+import asyncio
+import threading
+import unittest
+
+import main
+from prolog_terms import QueryCancelled, QueryTimeout, limits
+from query_service import AsyncQueryService, QueryService, ReadWriteLock
+from results import ANSWERED, CANCELLED, FAILED, LEARNED, TIMEOUT
+from test_main import use_graph_backend
+
+
+class ReadWriteLockTest(unittest.TestCase):
+
+    def test_readers_share(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        with limits(timeout=0.2):
+            lock.acquire_read(bounded=True)
+            with self.assertRaises(QueryTimeout):
+                lock.acquire_write(bounded=True)
+        lock.release_read()
+        lock.release_read()
+        lock.acquire_write()
+        lock.release_write()
+
+    def test_writer_excludes(self):
+        lock = ReadWriteLock()
+        lock.acquire_write()
+        with limits(timeout=0.2), self.assertRaises(QueryTimeout):
+            lock.acquire_read(bounded=True)
+        cancelled = threading.Event()
+        cancelled.set()
+        with limits(cancelled=cancelled), self.assertRaises(QueryCancelled):
+            lock.acquire_write(bounded=True)
+        lock.release_write()
+
+    def test_given_up_writer_lets_readers_in(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        with limits(timeout=0.1), self.assertRaises(QueryTimeout):
+            lock.acquire_write(bounded=True)
+        # No writer is waiting any more, so a new reader is not held back
+        with limits(timeout=0.1):
+            lock.acquire_read(bounded=True)
+
+
+class QueryServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        use_graph_backend()
+        self.service = QueryService(workers=4)
+        self.addCleanup(self.service.shutdown)
+
+    def test_answers(self):
+        sentences = ["Ann is the mother of Bob.", "Bob is the father of Cy.",
+                     "Is Ann a grandmother of Cy?", "Hello there."]
+        results = list(self.service.map(sentences))
+        self.assertEqual([result.status for result in results[:3]], [LEARNED, LEARNED, ANSWERED])
+        self.assertTrue(results[2].answer)
+        self.assertIsNone(results[3])
+
+    def test_timeout_waiting_for_writer(self):
+        self.service.lock.acquire_write()
+        try:
+            future = self.service.submit("Is Ann the mother of Bob?", timeout=0.1)
+            with self.assertRaises(QueryTimeout):
+                future.result()
+        finally:
+            self.service.lock.release_write()
+
+    def test_cancel_waiting_for_writer(self):
+        cancelled = threading.Event()
+        self.service.lock.acquire_write()
+        try:
+            future = self.service.submit("Is Ann the mother of Bob?", cancelled=cancelled)
+            cancelled.set()
+            with self.assertRaises(QueryCancelled):
+                future.result()
+        finally:
+            self.service.lock.release_write()
+
+
+class AsyncQueryServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        use_graph_backend()
+        main.process_sentence("Ann is the mother of Bob.")
+
+    def run_service(self, coroutine):
+        service = AsyncQueryService(workers=2)
+        try:
+            return asyncio.run(coroutine(service))
+        finally:
+            service.close()
+
+    def test_ask(self):
+        async def ask(service):
+            return await asyncio.gather(service.ask("Is Ann the mother of Bob?"),
+                                        service.ask("Is  Ann the mother of Bob?"),
+                                        service.ask("Bob is the father of Cy."))
+        yes, same, learned = self.run_service(ask)
+        self.assertEqual((yes.status, yes.answer), (ANSWERED, True))
+        self.assertEqual(same, yes)
+        self.assertEqual(learned.status, LEARNED)
+
+    def test_timeout(self):
+        async def ask(service):
+            service.service.lock.acquire_write()
+            try:
+                return await service.ask("Is Ann the mother of Bob?", timeout=0.1)
+            finally:
+                service.service.lock.release_write()
+        result = self.run_service(ask)
+        self.assertEqual((result.status, result.error), (FAILED, TIMEOUT))
+
+    def test_cancel(self):
+        async def ask(service):
+            service.service.lock.acquire_write()
+            task = asyncio.ensure_future(service.ask("Is Ann the mother of Bob?"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            service.service.lock.release_write()
+            # The cancelled question is forgotten; asking again runs it anew
+            return await service.ask("Is Ann the mother of Bob?")
+        result = self.run_service(ask)
+        self.assertEqual((result.status, result.answer), (ANSWERED, True))
+
+    def test_cancelled_result(self):
+        async def ask(service):
+            cancelled = threading.Event()
+            cancelled.set()
+            return await service._run("Is Ann the mother of Bob?", None, cancelled)
+        result = self.run_service(ask)
+        self.assertEqual((result.status, result.error), (FAILED, CANCELLED))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""Check the Python evaluators of relationship.pl against brute force.
+
+BruteForce derives every relation of relationship.pl by applying its
+rules literally to all pairs of people, with no indexes or shortcuts.
+FamilyIndex, GraphBackend and RelationMatrices must give the same
+answers on random families. The RelationMatrices checks are skipped
+when numpy or scipy is missing.
+
+    python -m pytest -q test_relations.py
+"""
+import random
+import unittest
+
+from backends import GRAPH_RELATIONS, RELATIVE_RELATIONS, GraphBackend
+from family_index import RELATIONS, FamilyIndex
+
+# Binary predicates main.py asserts as facts besides parent/2 and
+# siblings_direct/2 (see main.INDEXED_FACTS)
+EXPLICIT_FACTS = ("child", "son", "daughter", "uncle", "aunt", "cousin",
+                  "grandparent", "grandfather", "grandmother")
+
+# Random families per test, and their size
+FAMILIES = 30
+PEOPLE = 14
+
+
+class BruteForce:
+    """The rules of relationship.pl evaluated over every pair of people.
+
+    relation(name) returns the set of (X, Y) name pairs for which the
+    relation holds: the pairs its rule derives plus its asserted facts.
+    """
+
+    def __init__(self, facts):
+        self.people = sorted({name for _, names in facts for name in names})
+        self.asserted = {}
+        for predicate, names in facts:
+            self.asserted.setdefault(predicate, set()).add(names)
+        self._relations = {}
+
+    def fact(self, predicate):
+        return self.asserted.get(predicate, set())
+
+    def male(self, person):
+        return (person,) in self.fact("male")
+
+    def female(self, person):
+        return (person,) in self.fact("female")
+
+    def relation(self, name):
+        if name not in self._relations:
+            self._relations[name] = getattr(self, "_" + name)() | self.fact(name)
+        return self._relations[name]
+
+    def _parent(self):
+        return set()
+
+    def _father(self):
+        return {(x, y) for x, y in self.fact("parent") if self.male(x)}
+
+    def _mother(self):
+        return {(x, y) for x, y in self.fact("parent") if self.female(x)}
+
+    def _child(self):
+        return {(x, y) for y, x in self.fact("parent")}
+
+    def _son(self):
+        return {(x, y) for y, x in self.fact("parent") if self.male(x)}
+
+    def _daughter(self):
+        return {(x, y) for y, x in self.fact("parent") if self.female(x)}
+
+    def sibling_link(self):
+        direct = self.fact("siblings_direct")
+        links = direct | {(y, x) for x, y in direct}
+        parent = self.fact("parent")
+        links |= {(x, y) for p, x in parent for q, y in parent if p == q and x != y}
+        return links
+
+    def _siblings(self):
+        links = self.sibling_link()
+        siblings = {(x, y) for x, y in links if x != y}
+        while True:
+            more = {(x, y) for x, z in siblings for w, y in links if z == w and x != y}
+            if more <= siblings:
+                return siblings
+            siblings |= more
+
+    def _brother(self):
+        return {(x, y) for x, y in self.relation("siblings") if self.male(x)}
+
+    def _sister(self):
+        return {(x, y) for x, y in self.relation("siblings") if self.female(x)}
+
+    def _grandparent(self):
+        parent = self.fact("parent")
+        return {(x, y) for x, z in parent for w, y in parent if z == w}
+
+    def _grandfather(self):
+        return {(x, y) for x, y in self.relation("grandparent") if self.male(x)}
+
+    def _grandmother(self):
+        return {(x, y) for x, y in self.relation("grandparent") if self.female(x)}
+
+    def _grandchild(self):
+        return {(x, y) for y, x in self.relation("grandparent")}
+
+    def _aunt_or_uncle(self):
+        parent = self.fact("parent")
+        return {(x, y) for x, z in self.relation("siblings") for w, y in parent if z == w}
+
+    def _uncle(self):
+        return {(x, y) for x, y in self._aunt_or_uncle() if self.male(x)}
+
+    def _aunt(self):
+        return {(x, y) for x, y in self._aunt_or_uncle() if self.female(x)}
+
+    def _cousin(self):
+        parent = self.fact("parent")
+        siblings = self.relation("siblings")
+        return {(x, y) for px, x in parent for py, y in parent
+                if (px, py) in siblings and x != y}
+
+    def _relative(self):
+        result = set()
+        for part in RELATIVE_RELATIONS:
+            result |= self.relation(part)
+        return result
+
+
+def random_facts(rng, size=PEOPLE):
+    """Return the facts of a random family of size people.
+
+    Parents come from earlier in the list, so there are no cycles, and
+    each person has at most one gender, as main.py enforces.
+    """
+    people = [f"p{number}" for number in range(size)]
+    facts = []
+    for position, person in enumerate(people):
+        gender = rng.choice(["male", "female", None])
+        if gender:
+            facts.append((gender, (person,)))
+        if position:
+            for parent in rng.sample(people[:position], min(position, rng.randint(0, 2))):
+                facts.append(("parent", (parent, person)))
+    for _ in range(rng.randint(0, 3)):
+        facts.append(("siblings_direct", tuple(rng.sample(people, 2))))
+    for _ in range(rng.randint(0, 3)):
+        facts.append((rng.choice(EXPLICIT_FACTS), tuple(rng.sample(people, 2))))
+    rng.shuffle(facts)
+    return facts
+
+
+class RelationTest(unittest.TestCase):
+
+    def families(self):
+        rng = random.Random(2024)
+        for _ in range(FAMILIES):
+            facts = random_facts(rng)
+            yield facts, BruteForce(facts)
+
+    def test_family_index(self):
+        for facts, expected in self.families():
+            index = FamilyIndex()
+            for predicate, names in facts:
+                index.add_fact(predicate, *names)
+            for relation in sorted(RELATIONS):
+                pairs = expected.relation(relation)
+                for name2 in expected.people:
+                    person2 = index.people.lookup(name2)
+                    related = {index.name(person) for person in index.related(relation, person2)}
+                    self.assertEqual(related, {x for x, y in pairs if y == name2},
+                                     (relation, name2, facts))
+                    for name1 in expected.people:
+                        person1 = index.people.lookup(name1)
+                        self.assertEqual(index.holds(relation, person1, person2),
+                                         (name1, name2) in pairs, (relation, name1, name2, facts))
+
+    def test_graph_backend(self):
+        for facts, expected in self.families():
+            backend = GraphBackend(FamilyIndex())
+            backend.assert_facts(facts)
+            for relation in sorted(GRAPH_RELATIONS):
+                pairs = expected.relation(relation)
+                sets = backend.relation_sets(relation, expected.people)
+                for name2, related in zip(expected.people, sets):
+                    self.assertEqual(related, sorted(x for x, y in pairs if y == name2),
+                                     (relation, name2, facts))
+                    for name1 in expected.people:
+                        self.assertEqual(backend.exists(relation, name1, name2),
+                                         (name1, name2) in pairs, (relation, name1, name2, facts))
+
+    def test_relation_matrices(self):
+        try:
+            from relation_matrices import MATRIX_RELATIONS, RelationMatrices
+            import numpy  # noqa: F401
+            import scipy  # noqa: F401
+        except ImportError:
+            self.skipTest("numpy and scipy are required")
+        for facts, expected in self.families():
+            index = FamilyIndex()
+            for predicate, names in facts:
+                index.add_fact(predicate, *names)
+            matrices = RelationMatrices(index)
+            for relation in MATRIX_RELATIONS:
+                self.assertEqual(set(matrices.pairs(relation)), expected.relation(relation),
+                                 (relation, facts))
+                self.assertEqual(matrices.count(relation), len(expected.relation(relation)))
+
+
+if __name__ == "__main__":
+    unittest.main()